@@ -1,5 +1,7 @@
 from django.contrib import admin
+from .caching import bump_ads_list_version
 from .models import Ad, AdImage, Booking, Review, SearchQuery, AdView
+from .services import recount_ad_views
 
 @admin.register(Ad)
 class AdAdmin(admin.ModelAdmin):
@@ -18,7 +20,7 @@ class AdAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
     search_fields = ('id', 'title', 'location', 'description', 'owner__email')
     autocomplete_fields = ('owner',)
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('reviews_count', 'views_count', 'average_rating', 'created_at', 'updated_at')
     ordering = ('-created_at',)
     list_select_related = ('owner',)
 
@@ -35,11 +37,13 @@ class AdImageAdmin(admin.ModelAdmin):
 @admin.action(description="Confirm selected bookings")
 def confirm_bookings(modeladmin, request, qs):
     qs.update(status='CONFIRMED')
+    bump_ads_list_version()
 
 
 @admin.action(description="Cancel/Reject selected bookings")
 def cancel_bookings(modeladmin, request, qs):
     qs.update(status='CANCELLED')
+    bump_ads_list_version()
 
 
 @admin.register(Booking)
@@ -105,3 +109,13 @@ class AdViewAdmin(admin.ModelAdmin):
     autocomplete_fields = ('ad', 'user')
     readonly_fields = ('user_agent', 'created_at')
     list_select_related = ('ad', 'user')
+
+    # AdView deletes send no counter signal; keep Ad.views_count in step here
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recount_ad_views([obj.ad_id])
+
+    def delete_queryset(self, request, queryset):
+        ad_ids = set(queryset.values_list('ad_id', flat=True))
+        super().delete_queryset(request, queryset)
+        recount_ad_views(ad_ids)
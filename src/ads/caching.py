@@ -0,0 +1,43 @@
+"""
+Version token for the public ads list, used as the base of its ETag.
+
+Anything that can change a list page (ads, images, reviews, bookings for the
+availability filter) bumps the token after commit; the list view hashes it
+with the query string, so clients holding a current ETag get a 304 without
+the list query or serialization running.
+
+The token is a counter row in the database, not a cache entry: with a
+process-local cache (LocMemCache) every worker would keep its own token and
+miss bumps made by the others, by manage.py or by the admin.
+
+views_count is not part of this contract: detail hits do not bump the token,
+so a 304 may carry a view count that is behind until the next list change.
+That is why the list sends a weak ETag (W/"...").
+"""
+from django.db import transaction
+from django.db.models import F
+
+from .models import AdsListVersion
+
+ADS_LIST_VERSION_PK = 1
+
+
+def ads_list_version():
+    # one primary-key lookup; 0 until the first bump creates the row
+    version = (
+        AdsListVersion.objects.filter(pk=ADS_LIST_VERSION_PK)
+        .values_list("version", flat=True)
+        .first()
+    )
+    return version or 0
+
+
+def _bump():
+    updated = AdsListVersion.objects.filter(pk=ADS_LIST_VERSION_PK).update(version=F("version") + 1)
+    if not updated:
+        AdsListVersion.objects.get_or_create(pk=ADS_LIST_VERSION_PK, defaults={"version": 1})
+
+
+def bump_ads_list_version():
+    """Invalidate list ETags once the current transaction commits."""
+    transaction.on_commit(_bump)
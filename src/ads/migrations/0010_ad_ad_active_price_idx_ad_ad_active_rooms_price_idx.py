@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2025-09-02 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0009_adview_anon_ip_hash_adview_adview_anonhash_dedup_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['is_active', 'price'], name='ad_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['is_active', 'rooms', 'price'], name='ad_active_rooms_price_idx'),
+        ),
+    ]
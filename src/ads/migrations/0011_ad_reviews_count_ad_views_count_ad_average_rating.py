@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2025-09-03 09:41
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_ad_stats(apps, schema_editor):
+    """Fill the new counters from existing rows (one UPDATE with subqueries)."""
+    Ad = apps.get_model('ads', 'Ad')
+    Review = apps.get_model('ads', 'Review')
+    AdView = apps.get_model('ads', 'AdView')
+
+    reviews = Review.objects.filter(ad=OuterRef('pk')).order_by().values('ad')
+    views = AdView.objects.filter(ad=OuterRef('pk')).order_by().values('ad')
+    Ad.objects.update(
+        reviews_count=Coalesce(Subquery(reviews.annotate(c=Count('pk')).values('c')), 0),
+        views_count=Coalesce(Subquery(views.annotate(c=Count('pk')).values('c')), 0),
+        average_rating=Subquery(reviews.annotate(a=Avg('rating')).values('a')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0010_ad_ad_active_price_idx_ad_ad_active_rooms_price_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='reviews_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='ad',
+            name='views_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='ad',
+            name='average_rating',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_ad_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2025-09-04 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0011_ad_reviews_count_ad_views_count_ad_average_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdsListVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
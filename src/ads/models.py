@@ -29,6 +29,11 @@ class Ad(models.Model):
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     is_demo = models.BooleanField(default=False)
 
+    # Denormalized from Review/AdView, kept in sync by signals (see signals.py)
+    reviews_count = models.PositiveIntegerField(default=0, db_index=True)
+    views_count = models.PositiveIntegerField(default=0, db_index=True)
+    average_rating = models.FloatField(null=True, blank=True, db_index=True)
+
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -43,11 +48,27 @@ class Ad(models.Model):
             models.Index(fields=['is_active', 'created_at'], name='ad_active_created_idx'),
             models.Index(fields=['latitude', 'longitude'], name='ad_lat_lon_idx'),
             models.Index(fields=['housing_type'], name='ad_housing_type_idx'),
+            models.Index(fields=['is_active', 'price'], name='ad_active_price_idx'),
+            models.Index(fields=['is_active', 'rooms', 'price'], name='ad_active_rooms_price_idx'),
         ]
 
+    # Written only by the signal UPDATEs; a stale instance must not overwrite them
+    COUNTER_FIELDS = ('reviews_count', 'views_count', 'average_rating')
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Full saves of an existing row (serializer update, admin change form)
+        # skip the counters so a view/review logged meanwhile is not lost.
+        if (not self._state.adding and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class AdImage(models.Model):
     ad = models.ForeignKey(Ad, on_delete=models.CASCADE, related_name='images')
@@ -182,4 +203,15 @@ class AdView(models.Model):
 
     def __str__(self):
         who = self.user_id or self.anon_ip_hash or 'anon'
-        return f'View ad={self.ad_id} by {who} at {self.created_at:%Y-%m-%d %H:%M:%S}'
\ No newline at end of file
+        return f'View ad={self.ad_id} by {who} at {self.created_at:%Y-%m-%d %H:%M:%S}'
+
+
+class AdsListVersion(models.Model):
+    """
+    Single-row counter behind the ads list ETag (see caching.py).
+    Lives in the database so every worker process reads the same value.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"ads list v{self.version}"
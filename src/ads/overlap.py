@@ -0,0 +1,64 @@
+"""
+Batch overlap checks against CONFIRMED bookings.
+
+Bulk flows (seeding, batch booking forms) validate many candidate ranges at
+once. Instead of one overlap query per candidate, all confirmed ranges of the
+involved ads are loaded in a single query and every candidate is checked in
+memory with a binary search.
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate
+
+from .models import Booking
+
+
+class BookingBulkValidator:
+    """
+    Usage:
+        validator = BookingBulkValidator()
+        flags = validator.validate_many([(ad_id, date_from, date_to), ...])
+        # flags[i] is True when candidate i overlaps a confirmed booking
+
+    Ranges are inclusive on both ends, same as the single-row check in
+    BookingSerializer.validate (date_from <= other.date_to and date_to >= other.date_from).
+    """
+
+    def __init__(self, exclude_ids=()):
+        self.exclude_ids = set(exclude_ids)
+        # ad_id -> (sorted starts, running max of ends)
+        self._index = {}
+
+    def load(self, ad_ids):
+        """Fetch confirmed ranges for ads not loaded yet (one query)."""
+        missing = {int(a) for a in ad_ids} - self._index.keys()
+        if not missing:
+            return
+        qs = Booking.objects.filter(ad_id__in=missing, status=Booking.CONFIRMED)
+        if self.exclude_ids:
+            qs = qs.exclude(pk__in=self.exclude_ids)
+        ranges = defaultdict(list)
+        for ad_id, date_from, date_to in qs.values_list("ad_id", "date_from", "date_to"):
+            ranges[ad_id].append((date_from, date_to))
+        for ad_id in missing:
+            items = sorted(ranges.get(ad_id, ()))
+            starts = [f for f, _ in items]
+            max_ends = list(accumulate((t for _, t in items), max))
+            self._index[ad_id] = (starts, max_ends)
+
+    def overlaps(self, ad_id, date_from, date_to):
+        self.load([ad_id])
+        starts, max_ends = self._index[int(ad_id)]
+        # Only ranges starting on/before date_to can overlap; among those,
+        # the latest end decides whether any of them reaches date_from.
+        i = bisect_right(starts, date_to)
+        return i > 0 and max_ends[i - 1] >= date_from
+
+    def validate_many(self, candidates):
+        """
+        candidates: iterable of (ad_id, date_from, date_to).
+        Returns a list of booleans (True = overlaps a confirmed booking).
+        """
+        candidates = list(candidates)
+        self.load(ad_id for ad_id, _, _ in candidates)
+        return [self.overlaps(ad_id, f, t) for ad_id, f, t in candidates]
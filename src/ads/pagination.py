@@ -1,7 +1,42 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class AdCursorPagination(CursorPagination):
+    """
+    Keyset pagination for ads, always newest first.
+    ?ordering= is ignored here: a cursor needs a stable, non-null key, and
+    average_rating (NULL without reviews) or the view/review counters (change
+    between pages) would skip or repeat rows.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
 
 class AdPagination(PageNumberPagination):
-    """Page-number pagination for ads."""
+    """
+    Page-number pagination for ads.
+    Passing ?cursor= (empty for the first page) switches to AdCursorPagination:
+    no COUNT and no OFFSET, so deep pages cost the same as the first one.
+    Cursor pages are always ordered by -created_at, -id.
+    """
     page_size = 10                      # default items per page
     page_size_query_param = 'page_size' # allow ?page_size=
     max_page_size = 50                  # safety cap
+
+    cursor = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if AdCursorPagination.cursor_query_param in request.query_params:
+            self.cursor = AdCursorPagination()
+            return self.cursor.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor is not None:
+            return self.cursor.get_paginated_response(data)
+        return super().get_paginated_response(data)
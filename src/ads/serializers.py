@@ -1,8 +1,15 @@
 from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from django.db import IntegrityError, transaction
 from drf_spectacular.utils import extend_schema_field, OpenApiTypes
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 from .models import Ad, Booking, AdImage, Review
+from .overlap import BookingBulkValidator
+
+# Materialized once; `TextChoices.choices` builds a new list on every access.
+_HOUSING_CHOICES = tuple(Ad.HousingType.choices)
 
 
 # --- Small schema-only helpers for nested objects (keep them lightweight) ---
@@ -21,6 +28,24 @@ class ReviewShortSerializer(serializers.Serializer):
     created_at = serializers.DateTimeField()
 
 
+# Runtime builders for the shapes above: nested user/review objects are built as
+# plain dicts, the serializers only document them for OpenAPI.
+def _user_tiny(user):
+    if user is None:
+        return None
+    return {"id": user.id, "email": getattr(user, "email", None)}
+
+
+def _review_short(review):
+    return {
+        "id": review.id,
+        "rating": review.rating,
+        "comment": review.text,
+        "tenant": _user_tiny(review.tenant),
+        "created_at": review.created_at,
+    }
+
+
 class AdImageSerializer(serializers.ModelSerializer):
     # Absolute URL (with scheme/host) if request is in context
     image_url = serializers.SerializerMethodField()
@@ -72,18 +97,14 @@ class AdImageUploadSerializer(serializers.Serializer):
     caption = serializers.CharField(required=False, allow_blank=True, max_length=200)
 
     def validate(self, attrs):
+        # Accept if single 'image' or parsed 'images' provided…
+        if attrs.get('image') or attrs.get('images'):
+            return attrs
+        # …or if any files came as 'images' (membership only, no list needed)
         request = self.context.get('request')
-        # Accept if single 'image' provided…
-        if attrs.get('image'):
+        if request is not None and 'images' in request.FILES:
             return attrs
-        # …or if any files came as 'images'
-        files = []
-        if request is not None:
-            files = request.FILES.getlist('images')
-        images = attrs.get('images') or files
-        if not images:
-            raise serializers.ValidationError({'images': 'Provide at least one image.'})
-        return attrs
+        raise serializers.ValidationError({'images': 'Provide at least one image.'})
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -91,44 +112,81 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = "__all__"
+        # Explicit list in the order "__all__" produced (pk, declared, fields,
+        # relations), so responses stay identical without model introspection.
+        fields = (
+            "id", "comment",
+            "rating", "text", "created_at", "updated_at",
+            "ad", "tenant", "booking",
+        )
         read_only_fields = ("tenant", "ad")
+        # Review.booking is a OneToOneField, so the DB already enforces
+        # "one review per booking"; skip DRF's UniqueValidator query and
+        # translate the IntegrityError in create() instead.
+        extra_kwargs = {"booking": {"validators": []}}
+
+    @cached_property
+    def _user(self):
+        return self.context["request"].user
+
+    def to_internal_value(self, data):
+        # UPDATE that re-sends the current booking id: drop it before the
+        # related field resolves it with a SELECT (nothing would change).
+        if self.instance is not None and hasattr(data, "get"):
+            raw = data.get("booking")
+            if raw not in (None, "") and str(raw) == str(self.instance.booking_id):
+                data = data.copy()
+                data.pop("booking")
+        return super().to_internal_value(data)
 
     def validate(self, attrs):
         """
         For CREATE we allow missing `booking` (perform_create resolves by `ad`).
         For UPDATE or when `booking` is provided, enforce integrity checks here.
         """
-        request = self.context["request"]
-        user = request.user
         booking = attrs.get("booking")
-        ad = attrs.get("ad")
-
-        if booking is None and self.instance is None:
+        if booking is None:
+            # CREATE resolves the booking in perform_create; UPDATE keeps its own.
             return attrs
 
-        if booking and booking.tenant_id != user.id:
-            raise serializers.ValidationError({"booking": "Only the tenant can review this booking."})
-
-        if booking and booking.status != Booking.CONFIRMED:
-            raise serializers.ValidationError({"booking": "Only CONFIRMED bookings can be reviewed."})
-        if booking and timezone.localdate() < booking.date_to:
-            raise serializers.ValidationError({"booking": "You can review only after the stay has ended."})
-
-        if booking and ad and booking.ad_id != ad.id:
-            raise serializers.ValidationError({"ad": "Booking does not belong to this ad."})
+        user = self._user
+        today = timezone.localdate()
+        b_tenant_id = booking.tenant_id
+        b_status = booking.status
+        b_date_to = booking.date_to
+        b_ad_id = booking.ad_id
+        ad = attrs.get("ad")
 
-        if booking and Review.objects.filter(booking=booking).exists():
-            raise serializers.ValidationError({"booking": "This booking is already reviewed."})
+        # Collect every violation so the client sees them all at once
+        errors = {}
+        if b_tenant_id != user.id:
+            errors.setdefault("booking", []).append("Only the tenant can review this booking.")
+        if b_status != Booking.CONFIRMED:
+            errors.setdefault("booking", []).append("Only CONFIRMED bookings can be reviewed.")
+        if today < b_date_to:
+            errors.setdefault("booking", []).append("You can review only after the stay has ended.")
+        if ad and b_ad_id != ad.id:
+            errors["ad"] = ["Booking does not belong to this ad."]
 
+        if errors:
+            raise serializers.ValidationError(errors)
         return attrs
 
     def create(self, validated_data):
-        request = self.context["request"]
         booking = validated_data["booking"]
-        validated_data["tenant"] = request.user
+        validated_data["tenant"] = self._user
         validated_data["ad"] = booking.ad
-        return super().create(validated_data)
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            # Only the one-review-per-booking rule is a client error; FK/NOT NULL
+            # or any other constraint failure must surface as is. The savepoint
+            # has been rolled back, so the lookup runs on a clean connection.
+            if not Review.objects.filter(booking=booking).exists():
+                raise
+            # same shape the API used before the pre-insert check was dropped
+            raise serializers.ValidationError({"detail": "This booking is already reviewed."})
 
     def update(self, instance, validated_data):
         new_ad = validated_data.get("ad")
@@ -146,7 +204,7 @@ class AdSerializer(serializers.ModelSerializer):
     average_rating = serializers.FloatField(read_only=True)
     reviews_count = serializers.IntegerField(read_only=True)
     views_count = serializers.IntegerField(read_only=True)
-    housing_type = serializers.ChoiceField(choices=Ad.HousingType.choices)
+    housing_type = serializers.ChoiceField(choices=_HOUSING_CHOICES)
     recent_reviews = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
@@ -222,20 +280,34 @@ class AdSerializer(serializers.ModelSerializer):
         """
         Return last 3 reviews with rating/comment and tenant email.
         """
-        qs = (Review.objects
-              .filter(ad=obj)
-              .select_related("tenant")
-              .order_by("-created_at")[:3])
-        out = []
-        for r in qs:
-            out.append({
-                "id": r.id,
-                "rating": r.rating,
-                "comment": r.text,
-                "tenant": {"id": r.tenant_id, "email": getattr(r.tenant, "email", None)},
-                "created_at": r.created_at,
-            })
-        return out
+        qs = getattr(obj, "recent_reviews_prefetched", None)
+        if qs is None:  # instance not loaded through AdViewSet.get_queryset
+            qs = (Review.objects
+                  .filter(ad=obj)
+                  .select_related("tenant")
+                  .order_by("-created_at")[:3])
+        return [_review_short(r) for r in qs]
+
+
+class BookingBatchSerializer(serializers.ListSerializer):
+    """
+    Used for BookingSerializer(data=[...], many=True).
+    Loads confirmed ranges of all involved ads in one query up front, so the
+    per-item validate() checks overlaps in memory instead of querying per row.
+    """
+
+    def run_validation(self, data=serializers.empty):
+        if isinstance(data, list):
+            ad_ids = set()
+            for item in data:
+                try:
+                    ad_ids.add(int(item.get("ad")))
+                except (AttributeError, TypeError, ValueError):
+                    continue  # left for the child field to report
+            validator = BookingBulkValidator()
+            validator.load(ad_ids)
+            self._context = {**self._context, "overlap_validator": validator}
+        return super().run_validation(data)
 
 
 class BookingSerializer(serializers.ModelSerializer):
@@ -253,7 +325,9 @@ class BookingSerializer(serializers.ModelSerializer):
     )
     # Read-only denormalized fields for UI convenience:
     ad_id = serializers.IntegerField(read_only=True)
-    ad_title = serializers.CharField(source="ad.title", read_only=True)
+    # ReadOnlyField passes the value through (no CharField coercion per row);
+    # drf-spectacular still resolves the type from Ad.title.
+    ad_title = serializers.ReadOnlyField(source="ad.title")
 
     # Tenant/Owner as objects {id, email} for cards/tables
     tenant = serializers.SerializerMethodField(read_only=True)
@@ -282,6 +356,7 @@ class BookingSerializer(serializers.ModelSerializer):
             "status", "created_at",
             "can_cancel", "can_cancel_quote", "can_confirm", "can_reject",
         )
+        list_serializer_class = BookingBatchSerializer
 
     # -------------------------
     # Validation (server-side)
@@ -294,6 +369,8 @@ class BookingSerializer(serializers.ModelSerializer):
         - wrong order -> key 'date_to' with phrase 'greater than date_from'
         - date_from must be tomorrow+ -> key 'date_from'
         - confirmed overlap -> key 'non_field_errors'
+        Each message carries a stable code (ad_inactive, own_ad, date_order,
+        date_from_past, overlap) for clients that should not parse text.
         """
         request = self.context["request"]
         user = request.user
@@ -305,33 +382,46 @@ class BookingSerializer(serializers.ModelSerializer):
         errors = {}
 
         if ad and not getattr(ad, "is_active", True):
-            errors["ad"] = ["This ad is inactive."]
+            errors["ad"] = [ErrorDetail("This ad is inactive.", code="ad_inactive")]
 
         if ad and ad.owner_id == user.id:
-            errors.setdefault("non_field_errors", []).append("You cannot book your own ad.")
+            errors.setdefault("non_field_errors", []).append(
+                ErrorDetail("You cannot book your own ad.", code="own_ad")
+            )
 
         if date_from is not None and date_to is not None:
             if date_to <= date_from:
-                errors.setdefault("date_to", []).append("must be greater than date_from")
+                errors.setdefault("date_to", []).append(
+                    ErrorDetail("must be greater than date_from", code="date_order")
+                )
             today = timezone.localdate()
             if date_from <= today:
-                errors.setdefault("date_from", []).append("Start date must be at least tomorrow.")
-            if not errors:
-                overlap = Booking.objects.filter(
-                    ad=ad, status=Booking.CONFIRMED,
-                    date_from__lte=date_to, date_to__gte=date_from
+                errors.setdefault("date_from", []).append(
+                    ErrorDetail("Start date must be at least tomorrow.", code="date_from_past")
+                )
+            if not errors and self._has_confirmed_overlap(ad, date_from, date_to):
+                errors.setdefault("non_field_errors", []).append(
+                    ErrorDetail("Requested dates overlap with a confirmed booking.", code="overlap")
                 )
-                if self.instance:
-                    overlap = overlap.exclude(pk=self.instance.pk)
-                if overlap.exists():
-                    errors.setdefault("non_field_errors", []).append(
-                        "Requested dates overlap with a confirmed booking."
-                    )
 
         if errors:
             raise serializers.ValidationError(errors)
         return attrs
 
+    def _has_confirmed_overlap(self, ad, date_from, date_to):
+        # Batch mode: BookingBatchSerializer preloaded the confirmed ranges
+        validator = self.context.get("overlap_validator")
+        if validator is not None and self.instance is None:
+            return validator.overlaps(ad.id, date_from, date_to)
+
+        overlap = Booking.objects.filter(
+            ad=ad, status=Booking.CONFIRMED,
+            date_from__lte=date_to, date_to__gte=date_from
+        )
+        if self.instance:
+            overlap = overlap.exclude(pk=self.instance.pk)
+        return overlap.exists()
+
     def update(self, instance, validated_data):
         if "ad" in validated_data and validated_data["ad"].id != instance.ad_id:
             raise serializers.ValidationError({"ad": "Cannot change ad for an existing booking."})
@@ -344,56 +434,57 @@ class BookingSerializer(serializers.ModelSerializer):
     # -------------------------
     @extend_schema_field(PublicUserTinySerializer)
     def get_tenant(self, obj):
-        t = getattr(obj, "tenant", None)
-        if not t:
-            return None
-        return {"id": t.id, "email": t.email}
+        return _user_tiny(getattr(obj, "tenant", None))
 
     @extend_schema_field(PublicUserTinySerializer)
     def get_owner(self, obj):
         ad = getattr(obj, "ad", None)
-        if not ad or not getattr(ad, "owner", None):
-            return None
-        return {"id": ad.owner.id, "email": ad.owner.email}
+        return _user_tiny(getattr(ad, "owner", None)) if ad else None
 
     # Role helpers
     def _is_tenant(self, obj, user):
         return bool(user and obj.tenant_id == getattr(user, "id", None))
 
     def _is_owner(self, obj, user):
-        ad_owner_id = getattr(getattr(obj, "ad", None), "owner_id", None)
-        return bool(user and ad_owner_id == getattr(user, "id", None))
+        ad = getattr(obj, "ad", None)
+        return bool(user and ad and ad.owner_id == getattr(user, "id", None))
 
-    # Action flags
-    @extend_schema_field(OpenApiTypes.BOOL)
-    def get_can_cancel(self, obj):
-        user = getattr(self.context.get("request"), "user", None)
-        today = timezone.localdate()
+    # Per-serializer lookups: with many=True the child instance is shared by all
+    # rows, so user/today are resolved once per response instead of per flag.
+    @cached_property
+    def _viewer(self):
+        return getattr(self.context.get("request"), "user", None)
+
+    @cached_property
+    def _today(self):
+        return timezone.localdate()
+
+    def _tenant_can_cancel(self, obj):
         return (
-                self._is_tenant(obj, user)
+                self._is_tenant(obj, self._viewer)
                 and obj.status in (Booking.PENDING, Booking.CONFIRMED)
-                and obj.date_from > today  # only before start date
+                and obj.date_from > self._today  # only before start date
         )
 
+    def _owner_can_decide(self, obj):
+        return self._is_owner(obj, self._viewer) and obj.status == Booking.PENDING
+
+    # Action flags
+    @extend_schema_field(OpenApiTypes.BOOL)
+    def get_can_cancel(self, obj):
+        return self._tenant_can_cancel(obj)
+
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_can_cancel_quote(self, obj):
-        user = getattr(self.context.get("request"), "user", None)
-        today = timezone.localdate()
-        return (
-                self._is_tenant(obj, user)
-                and obj.status in (Booking.PENDING, Booking.CONFIRMED)
-                and obj.date_from > today  # only before the start date
-        )
+        return self._tenant_can_cancel(obj)
 
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_can_confirm(self, obj):
-        user = getattr(self.context.get("request"), "user", None)
-        return self._is_owner(obj, user) and obj.status == Booking.PENDING
+        return self._owner_can_decide(obj)
 
     @extend_schema_field(OpenApiTypes.BOOL)
     def get_can_reject(self, obj):
-        user = getattr(self.context.get("request"), "user", None)
-        return self._is_owner(obj, user) and obj.status == Booking.PENDING
+        return self._owner_can_decide(obj)
 
 
 class AvailabilityItemSerializer(serializers.Serializer):
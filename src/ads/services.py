@@ -0,0 +1,64 @@
+"""
+Booking state transitions and Ad counter upkeep shared by the API views and
+the admin (usable without HTTP).
+"""
+from django.db import transaction
+from django.db.models import Case, Count, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .caching import bump_ads_list_version
+from .models import Ad, AdView, Booking
+
+
+class BookingOverlapError(Exception):
+    """The booking's dates overlap a booking that is already CONFIRMED."""
+
+
+def confirm_booking(booking):
+    """
+    PENDING -> CONFIRMED, then cancel every PENDING booking of the same ad
+    whose dates overlap it. Ownership/status checks are the caller's job.
+    Returns the number of auto-cancelled bookings.
+
+    Confirmations of one ad are serialized by locking its row, so two
+    overlapping bookings cannot both end up CONFIRMED; the loser gets
+    BookingOverlapError.
+    """
+    overlapping = Booking.objects.filter(
+        ad_id=booking.ad_id,
+        date_from__lte=booking.date_to,
+        date_to__gte=booking.date_from,
+    ).exclude(pk=booking.pk)
+
+    with transaction.atomic():
+        # MySQL has no exclusion constraints; the ad row lock plays that role
+        Ad.objects.select_for_update().only("pk").get(pk=booking.ad_id)
+        if overlapping.filter(status=Booking.CONFIRMED).exists():
+            raise BookingOverlapError
+        # One UPDATE flips the target and cancels the overlapping PENDING rows;
+        # the target always overlaps its own range, so it is in the same set
+        changed = Booking.objects.filter(
+            Q(pk=booking.pk) | Q(status=Booking.PENDING),
+            ad_id=booking.ad_id,
+            date_from__lte=booking.date_to,
+            date_to__gte=booking.date_from,
+        ).update(
+            status=Case(
+                When(pk=booking.pk, then=Value(Booking.CONFIRMED)),
+                default=Value(Booking.CANCELLED),
+            )
+        )
+        booking.status = Booking.CONFIRMED
+        # queryset updates send no signals; availability filters changed
+        bump_ads_list_version()
+        return changed - 1
+
+
+def recount_ad_views(ad_ids):
+    """
+    Reset Ad.views_count from the views table for the given ads (one UPDATE).
+    For code that deletes AdView rows: there is no post_delete signal for them.
+    """
+    views = (AdView.objects.filter(ad=OuterRef('pk')).order_by().values('ad')
+             .annotate(c=Count('pk')).values('c'))
+    Ad.objects.filter(pk__in=ad_ids).update(views_count=Coalesce(Subquery(views), 0))
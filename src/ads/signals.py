@@ -1,29 +1,74 @@
-# Signal handlers for cleaning up AdImage files on replace and delete.
+# Signal handlers for cleaning up AdImage files on replace and delete,
+# keeping the denormalized Ad counters in sync, and for invalidating the
+# ads list ETag.
 
-from django.db.models.signals import post_delete, pre_save
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import AdImage
+from .caching import bump_ads_list_version
+from .models import Ad, AdImage, AdView, Booking, Review
 
 
 def _safe_delete_file(file_field):
-    """Delete underlying file from storage if it exists."""
+    """
+    Delete underlying file from storage.
+    No exists() probe: FileSystemStorage.delete already ignores missing files,
+    and on remote storages it would be an extra round trip per delete.
+    """
     try:
         if not file_field:
             return
-        storage = file_field.storage
         name = file_field.name
-        if name and storage.exists(name):
-            storage.delete(name)
+        if name:
+            file_field.storage.delete(name)
     except Exception:
-        # Never break main flow because of FS issues
+        # Never break main flow because of FS issues (incl. already-missing files)
         pass
 
 
+_delete_pool = None
+_delete_pool_workers = 0
+_delete_pool_lock = threading.Lock()
+
+
+def _delete_in_background(file_field):
+    """
+    Hand the storage delete to a small thread pool (I/O bound, so threads help
+    when an Ad with many images is deleted on remote storage).
+    AD_IMAGE_DELETE_WORKERS = 0 keeps deletes inline. The setting is read on
+    every call; a changed size replaces the pool (queued deletes still finish).
+    """
+    global _delete_pool, _delete_pool_workers
+    workers = getattr(settings, "AD_IMAGE_DELETE_WORKERS", 0)
+    if workers <= 0:
+        _safe_delete_file(file_field)
+        return
+    # on_commit callbacks run on request threads: create and submit under the
+    # lock so no thread submits to a pool another thread has just replaced
+    with _delete_pool_lock:
+        if _delete_pool is None or _delete_pool_workers != workers:
+            if _delete_pool is not None:
+                _delete_pool.shutdown(wait=False)
+            _delete_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="adimage-delete")
+            _delete_pool_workers = workers
+        _delete_pool.submit(_safe_delete_file, file_field)
+
+
 @receiver(post_delete, sender=AdImage)
 def adimage_post_delete(sender, instance: AdImage, **kwargs):
-    """Remove file from storage when AdImage row is deleted."""
-    _safe_delete_file(instance.image)
+    """
+    Remove file from storage when AdImage row is deleted.
+    Deferred until commit: storage I/O stays out of the open transaction and
+    the file survives if the delete is rolled back.
+    """
+    file_field = instance.image
+    transaction.on_commit(lambda: _delete_in_background(file_field))
 
 
 @receiver(pre_save, sender=AdImage)
@@ -31,10 +76,13 @@ def adimage_pre_save_replace(sender, instance: AdImage, **kwargs):
     """
     If image file changes on update, delete the previous file from storage.
     """
-    if not instance.pk:
+    if instance._state.adding:
         return  # new object, nothing to replace
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "image" not in update_fields:
+        return  # e.g. caption-only save, file cannot change
     try:
-        old = AdImage.objects.get(pk=instance.pk)
+        old = AdImage.objects.only("image").get(pk=instance.pk)
     except AdImage.DoesNotExist:
         return
     old_file = getattr(old, "image", None)
@@ -42,3 +90,57 @@ def adimage_pre_save_replace(sender, instance: AdImage, **kwargs):
     # If the file path changed, remove the previous one
     if old_file and new_file and old_file.name != new_file.name:
         _safe_delete_file(old_file)
+
+
+def _ad_cascade(origin):
+    """
+    True when the delete was started on Ad rows (instance or queryset): the
+    child rows go with their ad, so per-row upkeep on it would be wasted.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is Ad
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def ad_review_stats(sender, instance: Review, **kwargs):
+    """
+    Recompute Ad.reviews_count / average_rating from the reviews table.
+    One aggregate + one UPDATE; a rating edit changes the average too.
+    """
+    if _ad_cascade(kwargs.get('origin')):
+        return
+    stats = Review.objects.filter(ad_id=instance.ad_id).aggregate(c=Count('pk'), avg=Avg('rating'))
+    Ad.objects.filter(pk=instance.ad_id).update(reviews_count=stats['c'], average_rating=stats['avg'])
+
+
+@receiver(post_save, sender=AdView)
+def ad_view_counted(sender, instance: AdView, created, **kwargs):
+    """
+    Bump Ad.views_count in the database (no read, no race between requests).
+    There is deliberately no post_delete twin: any delete receiver on AdView
+    turns the Ad -> views cascade from one DELETE into loading every view row.
+    Code that deletes views directly recounts (services.recount_ad_views).
+    """
+    if created:
+        Ad.objects.filter(pk=instance.ad_id).update(views_count=F('views_count') + 1)
+
+
+@receiver(post_save, sender=Ad)
+@receiver(post_delete, sender=Ad)
+@receiver(post_save, sender=AdImage)
+@receiver(post_delete, sender=AdImage)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def ads_list_changed(sender, **kwargs):
+    """
+    Rows shown in (or filtering) the ads list changed: new list ETag.
+    AdView is left out on purpose: view counts are not part of the list's
+    conditional contract (see caching.py).
+    Children deleted along with an ad are covered by the ad's own bump.
+    """
+    if sender is not Ad and _ad_cascade(kwargs.get('origin')):
+        return
+    bump_ads_list_version()
@@ -0,0 +1,20 @@
+from functools import lru_cache
+from io import BytesIO
+
+# Smallest valid PNG (1x1 RGBA) for tests that need "an image" but not its
+# pixels or dimensions; no Pillow involved.
+MINIMAL_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000b4944415478da636000020000050001e9fadcd80000000049454e44ae426082"
+)
+
+
+@lru_cache(maxsize=32)
+def make_image_bytes(w=50, h=50, fmt="JPEG", color=(123, 123, 123)):
+    """Encoded image bytes; cached per (w, h, fmt, color) since bytes are immutable."""
+    from PIL import Image  # lazy: keeps Pillow out of test collection
+
+    buf = BytesIO()
+    img = Image.new("RGB", (w, h), color=color)
+    img.save(buf, format=fmt)
+    return buf.getvalue()
@@ -0,0 +1,3 @@
+def extract_results(data):
+    """Items of a list response, with or without DRF pagination."""
+    return data["results"] if isinstance(data, dict) and "results" in data else data
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from src.ads.models import Ad, AdView, Review
+from src.ads.services import recount_ad_views
+from src.ads.factories import AdFactory
+
+
+class AdDeleteCostTests(TestCase):
+    """Counter upkeep must not turn an ad delete into per-child queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(email="owner@example.com", password="x")
+        cls.tenants = [
+            User.objects.create_user(email=f"t{i}@example.com", password="x") for i in range(5)
+        ]
+
+    def _ad_with(self, views, reviews):
+        ad = AdFactory(owner=self.owner)
+        AdView.objects.bulk_create([AdView(ad=ad, anon_ip_hash=f"h{i}") for i in range(views)])
+        for tenant in self.tenants[:reviews]:
+            Review.objects.create(ad=ad, tenant=tenant, rating=4)
+        return ad
+
+    def test_delete_query_count_does_not_grow_with_children(self):
+        small = self._ad_with(views=1, reviews=1)
+        with CaptureQueriesContext(connection) as baseline:
+            small.delete()
+
+        big = self._ad_with(views=30, reviews=5)
+        with self.assertNumQueries(len(baseline)):
+            big.delete()
+        self.assertFalse(AdView.objects.filter(ad_id=big.pk).exists())
+        self.assertFalse(Review.objects.filter(ad_id=big.pk).exists())
+
+    def test_recount_ad_views(self):
+        ad = self._ad_with(views=3, reviews=0)
+        AdView.objects.filter(ad=ad).first().delete()
+        recount_ad_views([ad.pk])
+        ad.refresh_from_db()
+        self.assertEqual(ad.views_count, 2)
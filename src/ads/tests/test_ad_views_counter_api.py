@@ -3,17 +3,20 @@
 # - Detail response exposes "views_count" (int)
 # - Second GET should return value >= first (some implementations increment once per session/TTL)
 
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
 
-from src.ads.models import Ad
+from src.ads.models import Ad, AdView
+from src.ads.views import AdViewSet
 
 
 class AdViewsCounterApiTests(APITestCase):
     @classmethod
     def setUpTestData(cls):
         User = get_user_model()
-        owner = User.objects.create_user(email="owner@example.com", password="x")
+        cls.owner = owner = User.objects.create_user(email="owner@example.com", password="x")
         cls.ad = Ad.objects.create(
             title="Viewed Ad",
             description="desc",
@@ -37,3 +40,32 @@ class AdViewsCounterApiTests(APITestCase):
         self.assertIn("views_count", r2.data)
         # Allow equal (if dedup/TTL) or increased value
         self.assertGreaterEqual(r2.data["views_count"], r1.data["views_count"])
+
+    def test_first_view_is_counted_in_the_same_response(self):
+        url = f"/api/ads/{self.ad.id}/"
+        r1 = self.client.get(url)
+        self.assertEqual(r1.data["views_count"], 1)
+
+        # same client within the dedup window: not counted again
+        r2 = self.client.get(url)
+        self.assertEqual(r2.data["views_count"], 1)
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.views_count, 1)
+
+    def test_patch_keeps_view_logged_after_load(self):
+        original = AdViewSet.get_object
+
+        def get_object_then_view(viewset):
+            obj = original(viewset)
+            # another visitor is counted while the PATCH holds a stale instance
+            AdView.objects.create(ad=obj, anon_ip_hash="other-visitor")
+            return obj
+
+        self.client.force_authenticate(self.owner)
+        with mock.patch.object(AdViewSet, "get_object", get_object_then_view):
+            res = self.client.patch(f"/api/ads/{self.ad.id}/", {"title": "Renamed"}, format="json")
+        self.assertEqual(res.status_code, 200)
+
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.title, "Renamed")
+        self.assertEqual(self.ad.views_count, 1)
@@ -1,26 +1,30 @@
 import os
 from tempfile import TemporaryDirectory
+from unittest import mock
+from uuid import uuid4
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase, override_settings
+from src.ads import signals
 from src.ads.models import Ad, AdImage
 
-@override_settings(MEDIA_ROOT=None)  # будет установлен в setUp
+@override_settings(AD_IMAGE_DELETE_WORKERS=0)  # удаление файлов синхронно
 class AdImageFileCleanupTests(TestCase):
 
-    def setUp(self):
-        # Создаем временную директорию для медиа на время теста
-        self.tmpdir = TemporaryDirectory()
-        self.addCleanup(self.tmpdir.cleanup)
-        # Устанавливаем MEDIA_ROOT на временную директорию
-        self._override = override_settings(MEDIA_ROOT=self.tmpdir.name)
-        self._override.enable()
-        self.addCleanup(self._override.disable)
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Одна временная директория на класс, удаляется после всех тестов
+        cls._tmp = TemporaryDirectory()
+        cls.addClassCleanup(cls._tmp.cleanup)
 
+    @classmethod
+    def setUpTestData(cls):
         User = get_user_model()
         owner = User.objects.create_user(email="owner@example.com", password="x")
 
-        self.ad = Ad.objects.create(
+        cls.ad = Ad.objects.create(
             title="Ad",
             description="desc",
             location="Berlin",
@@ -31,24 +35,47 @@ class AdImageFileCleanupTests(TestCase):
             owner=owner,
         )
 
+    def setUp(self):
+        # Отдельная поддиректория на тест (storage создаст её при записи)
+        self.media_sub = os.path.join(self._tmp.name, uuid4().hex)
+        # Устанавливаем MEDIA_ROOT на временную директорию
+        self._override = override_settings(MEDIA_ROOT=self.media_sub)
+        self._override.enable()
+        self.addCleanup(self._override.disable)
+
     def _fake_image(self, name="test.jpg", content=b"fake-bytes"):
         return SimpleUploadedFile(name=name, content=content, content_type="image/jpeg")
 
     def test_delete_removes_file(self):
         img = AdImage.objects.create(ad=self.ad, image=self._fake_image())
-        path = img.image.path
-        self.assertTrue(os.path.exists(path))
-        img.delete()
-        self.assertFalse(os.path.exists(path), "File should be removed from storage on delete")
+        name = img.image.name
+        self.assertTrue(default_storage.exists(name))
+        # File removal runs on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            img.delete()
+        self.assertFalse(default_storage.exists(name), "File should be removed from storage on delete")
+
+    @override_settings(AD_IMAGE_DELETE_WORKERS=2)
+    def test_delete_removes_file_on_pool(self):
+        img = AdImage.objects.create(ad=self.ad, image=self._fake_image())
+        name = img.image.name
+        # a pool of our own, so shutting it down does not affect other tests
+        with mock.patch.object(signals, "_delete_pool", None):
+            with self.captureOnCommitCallbacks(execute=True):
+                img.delete()
+            pool = signals._delete_pool
+            self.assertIsNotNone(pool, "Delete should go through the worker pool")
+            pool.shutdown(wait=True)
+        self.assertFalse(default_storage.exists(name), "File should be removed by the pool")
 
     def test_replace_removes_old_file(self):
         img = AdImage.objects.create(ad=self.ad, image=self._fake_image("old.jpg"))
-        old_path = img.image.path
-        self.assertTrue(os.path.exists(old_path))
+        old_name = img.image.name
+        self.assertTrue(default_storage.exists(old_name))
 
         # Заменяем файл
         img.image = self._fake_image("new.jpg", b"new-content")
         img.save(update_fields=["image"])
 
-        self.assertFalse(os.path.exists(old_path), "Old file should be removed on replace")
-        self.assertTrue(os.path.exists(img.image.path), "New file should exist")
+        self.assertFalse(default_storage.exists(old_name), "Old file should be removed on replace")
+        self.assertTrue(default_storage.exists(img.image.name), "New file should exist")
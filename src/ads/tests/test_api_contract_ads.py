@@ -2,9 +2,12 @@
 # Contract tests for /api/ads/
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
-from src.ads.models import Ad
+from src.ads.models import Ad, AdImage, AdView, Review
+from src.ads.tests._utils import extract_results
 
 
 REQUIRED_FIELDS = {
@@ -34,13 +37,11 @@ class AdsApiContractTests(APITestCase):
             longitude=13.405,
         )
 
-    def _extract_results(self, data):
-        # совместимо с пагинацией DRF и без неё
-        return data["results"] if isinstance(data, dict) and "results" in data else data
-
     def test_list_has_required_fields_and_pagination(self):
         url = reverse("ads:ad-list")
-        res = self.client.get(url, {"page_size": 1})
+        # ETag version + COUNT + page SELECT + images prefetch + recent reviews prefetch
+        with self.assertNumQueries(5):
+            res = self.client.get(url, {"page_size": 1})
         self.assertEqual(res.status_code, 200)
 
         # Считаем, что включена пагинация DRF: есть count и results
@@ -48,7 +49,7 @@ class AdsApiContractTests(APITestCase):
             self.assertIn("count", res.data)
             self.assertIn("results", res.data)
 
-        items = self._extract_results(res.data)
+        items = extract_results(res.data)
         self.assertIsInstance(items, list)
         self.assertGreaterEqual(len(items), 1)
 
@@ -56,9 +57,153 @@ class AdsApiContractTests(APITestCase):
         missing = REQUIRED_FIELDS - set(ad.keys())
         self.assertFalse(missing, f"Missing fields: {missing}")
 
+    def test_list_queries_do_not_grow_with_rows(self):
+        """Guard against N+1: every nested field must come from a prefetch."""
+        url = reverse("ads:ad-list")
+        with CaptureQueriesContext(connection) as one:
+            self.client.get(url, {"page_size": 10})
+
+        User = get_user_model()
+        owner = User.objects.get(email="owner@example.com")
+        tenant = User.objects.create_user(email="tenant@example.com", password="x")
+        for i in range(4):
+            ad = Ad.objects.create(
+                title=f"Contract Ad {i}", description="desc", location="Berlin",
+                price=900, rooms=1, housing_type="apartment", is_active=True, owner=owner,
+            )
+            AdImage.objects.create(ad=ad, image=f"ad_images/contract_{i}.jpg")
+            Review.objects.create(ad=ad, tenant=tenant, rating=4, text="ok")
+
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(url, {"page_size": 10})
+        self.assertEqual(len(extract_results(res.data)), 5)
+        self.assertEqual(len(many), len(one), [q["sql"] for q in many.captured_queries])
+
+    def test_list_cursor_pagination(self):
+        owner = get_user_model().objects.get(email="owner@example.com")
+        Ad.objects.create(
+            title="Contract Ad 2", description="desc", location="Berlin",
+            price=900, rooms=1, housing_type="apartment", is_active=True, owner=owner,
+        )
+        url = reverse("ads:ad-list")
+        # no COUNT in cursor mode: ETag version + page SELECT + images + recent reviews
+        with self.assertNumQueries(4):
+            res = self.client.get(url, {"cursor": "", "page_size": 1})
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn("count", res.data)
+        self.assertIsNotNone(res.data["next"])
+        first = extract_results(res.data)
+
+        res = self.client.get(res.data["next"])
+        self.assertEqual(res.status_code, 200)
+        second = extract_results(res.data)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(first[0]["id"], second[0]["id"])
+
+    def test_list_cursor_ignores_ordering_on_nullable_rating(self):
+        owner = get_user_model().objects.get(email="owner@example.com")
+        for i in range(3):
+            Ad.objects.create(
+                title=f"No reviews {i}", description="desc", location="Berlin",
+                price=900, rooms=1, housing_type="apartment", is_active=True, owner=owner,
+            )
+        expected = list(
+            Ad.objects.filter(is_active=True).order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        url = reverse("ads:ad-list")
+
+        # average_rating is NULL for all of them; the walk must still cover each ad once
+        seen = []
+        res = self.client.get(url, {"cursor": "", "ordering": "-average_rating", "page_size": 1})
+        while True:
+            self.assertEqual(res.status_code, 200)
+            seen += [item["id"] for item in extract_results(res.data)]
+            if not res.data["next"]:
+                break
+            res = self.client.get(res.data["next"])
+        self.assertEqual(seen, expected)
+
+    def test_list_etag_not_modified(self):
+        url = reverse("ads:ad-list")
+        first = self.client.get(url, {"page_size": 1})
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first["ETag"].startswith('W/"'))
+
+        # Same query + current tag -> 304 after the version lookup alone
+        with self.assertNumQueries(1):
+            res = self.client.get(url, {"page_size": 1}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res["ETag"], first["ETag"])
+
+    def test_list_etag_compared_weakly(self):
+        url = reverse("ads:ad-list")
+        first = self.client.get(url, {"page_size": 1})
+        strong = first["ETag"].removeprefix("W/")
+
+        res = self.client.get(url, {"page_size": 1}, HTTP_IF_NONE_MATCH=f'"other", {strong}')
+        self.assertEqual(res.status_code, 304)
+
+    def test_list_etag_survives_detail_views(self):
+        url = reverse("ads:ad-list")
+        first = self.client.get(url, {"page_size": 1})
+
+        # a detail hit logs an AdView; view counts are not part of the list ETag
+        ad = Ad.objects.get(title="Contract Ad")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse("ads:ad-detail", args=[ad.pk]))
+
+        res = self.client.get(url, {"page_size": 1}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 304)
+
+    def test_list_etag_changes_after_write(self):
+        url = reverse("ads:ad-list")
+        first = self.client.get(url, {"page_size": 1})
+
+        # the version token is bumped on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            ad = Ad.objects.get(title="Contract Ad")
+            ad.price = 1100
+            ad.save(update_fields=["price"])
+
+        res = self.client.get(url, {"page_size": 1}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], first["ETag"])
+
     def test_ordering_supported(self):
         url = reverse("ads:ad-list")
         # проверяем, что параметр ordering не взрывает и возвращает 200
         for field in ["price", "-price", "average_rating", "-average_rating", "views_count", "-views_count"]:
             res = self.client.get(url, {"ordering": field, "page_size": 1})
             self.assertEqual(res.status_code, 200)
+
+    def test_housing_type_filter_is_case_insensitive(self):
+        url = reverse("ads:ad-list")
+        res = self.client.get(url, {"housing_type": "Apartment"})
+        self.assertEqual(res.data["count"], 1)
+        res = self.client.get(url, {"housing_type": "house"})
+        self.assertEqual(res.data["count"], 0)
+
+    def test_list_counters_follow_reviews_and_views(self):
+        """Denormalized counters on Ad are kept in sync by signals."""
+        ad = Ad.objects.get(title="Contract Ad")
+        User = get_user_model()
+        t1 = User.objects.create_user(email="t1@example.com", password="x")
+        t2 = User.objects.create_user(email="t2@example.com", password="x")
+        Review.objects.create(ad=ad, tenant=t1, rating=4)
+        low = Review.objects.create(ad=ad, tenant=t2, rating=2)
+        low.rating = 5
+        low.save()
+        for i in range(3):
+            AdView.objects.create(ad=ad, anon_ip_hash=f"h{i}")
+
+        res = self.client.get(reverse("ads:ad-list"))
+        item = extract_results(res.data)[0]
+        self.assertEqual(item["reviews_count"], 2)
+        self.assertEqual(item["views_count"], 3)
+        self.assertAlmostEqual(item["average_rating"], 4.5)
+
+        low.delete()
+        ad.refresh_from_db()
+        self.assertEqual(ad.reviews_count, 1)
+        self.assertEqual(ad.average_rating, 4)
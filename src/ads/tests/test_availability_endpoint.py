@@ -1,55 +1,47 @@
 from datetime import date, timedelta
 from django.contrib.auth import get_user_model
-from django.test import TestCase
-from rest_framework.test import APIClient
-from src.ads.models import Ad, Booking
+from rest_framework.test import APITestCase
+from src.ads.models import Booking
+from src.ads.factories import AdFactory
 
-class AvailabilityEndpointTests(TestCase):
+class AvailabilityEndpointTests(APITestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         User = get_user_model()
-        self.owner = User.objects.create_user(email="owner@example.com", password="x")
-        self.tenant = User.objects.create_user(email="tenant@example.com", password="x")
-        self.ad = Ad.objects.create(
-            title="Apt",
-            description="desc",
-            location="Berlin",
-            price=100,
-            rooms=2,
-            housing_type="apartment",
-            is_active=True,
-            owner=self.owner,
-        )
+        cls.owner = User.objects.create_user(email="owner@example.com", password="x")
+        cls.tenant = User.objects.create_user(email="tenant@example.com", password="x")
+        cls.ad = AdFactory(owner=cls.owner)
 
-        today = date.today()
+        cls.today = today = date.today()
         # Ranges:
         # PENDING: [D+3 .. D+5]
         # CONFIRMED: [D+7 .. D+9]
         # CANCELLED: [D+11 .. D+13] (must NOT appear)
         Booking.objects.create(
-            ad=self.ad, tenant=self.tenant,
+            ad=cls.ad, tenant=cls.tenant,
             date_from=today + timedelta(days=3),
             date_to=today + timedelta(days=5),
             status=Booking.PENDING,
         )
         Booking.objects.create(
-            ad=self.ad, tenant=self.tenant,
+            ad=cls.ad, tenant=cls.tenant,
             date_from=today + timedelta(days=7),
             date_to=today + timedelta(days=9),
             status=Booking.CONFIRMED,
         )
         Booking.objects.create(
-            ad=self.ad, tenant=self.tenant,
+            ad=cls.ad, tenant=cls.tenant,
             date_from=today + timedelta(days=11),
             date_to=today + timedelta(days=13),
             status=Booking.CANCELLED,
         )
 
-        self.client = APIClient()
-
     def test_availability_returns_pending_and_confirmed_only(self):
         """Endpoint returns PENDING + CONFIRMED ranges; CANCELLED is excluded."""
-        r = self.client.get(f"/api/ads/{self.ad.id}/availability/")
+        # ad lookup + one values() query over its bookings
+        with self.assertNumQueries(2):
+            r = self.client.get(f"/api/ads/{self.ad.id}/availability/")
         self.assertEqual(r.status_code, 200)
 
         data = r.json()
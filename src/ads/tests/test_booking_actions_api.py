@@ -13,7 +13,8 @@ from datetime import date, timedelta
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
 
-from src.ads.models import Ad, Booking
+from src.ads.models import Booking
+from src.ads.factories import AdFactory
 
 
 class BookingActionsApiTests(APITestCase):
@@ -23,16 +24,7 @@ class BookingActionsApiTests(APITestCase):
         cls.owner = User.objects.create_user(email="owner@example.com", password="x")
         cls.tenant = User.objects.create_user(email="tenant@example.com", password="x")
 
-        cls.ad = Ad.objects.create(
-            title="Actions Apartment",
-            description="desc",
-            location="Berlin",
-            price=1000,
-            rooms=2,
-            housing_type="apartment",
-            is_active=True,
-            owner=cls.owner,
-        )
+        cls.ad = AdFactory(owner=cls.owner, title="Actions Apartment", price=1000)
         cls.d1 = date.today() + timedelta(days=5)
         cls.d2 = cls.d1 + timedelta(days=3)
 
@@ -2,20 +2,18 @@ from decimal import Decimal
 from datetime import timedelta
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from rest_framework.test import APIClient, APITestCase
-from src.ads.models import Ad, Booking
+from rest_framework.test import APITestCase
+from src.ads.models import Booking
+from src.ads.factories import AdFactory
 
 class CancelQuoteTests(APITestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         User = get_user_model()
-        self.tenant = User.objects.create_user(email="tenant@example.com", password="x")
-        self.owner = User.objects.create_user(email="owner@example.com", password="x")
-        self.ad = Ad.objects.create(
-            owner=self.owner, title="t", description="d", location="L",
-            price=Decimal("100.00"), rooms=1, housing_type="apartment", is_active=True
-        )
-        self.client = APIClient()
+        cls.tenant = User.objects.create_user(email="tenant@example.com", password="x")
+        cls.owner = User.objects.create_user(email="owner@example.com", password="x")
+        cls.ad = AdFactory(owner=cls.owner, price=Decimal("100.00"))
 
     def make_booking(self, start_delta_days, nights=5, status=Booking.CONFIRMED):
         today = timezone.now().date()
@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from src.ads.factories import AdFactory
+from src.ads.models import Booking
+from src.ads.overlap import BookingBulkValidator
+from src.ads.serializers import BookingSerializer
+
+
+class BookingBulkValidatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(email="owner@example.com", password="x")
+        cls.tenant = User.objects.create_user(email="tenant@example.com", password="x")
+        cls.ad = AdFactory(owner=cls.owner)
+        cls.ad2 = AdFactory(owner=cls.owner)
+        cls.d = date.today() + timedelta(days=10)
+        # Confirmed [D .. D+5] on ad, pending [D+10 .. D+12] must be ignored
+        cls.confirmed = Booking.objects.create(
+            ad=cls.ad, tenant=cls.tenant,
+            date_from=cls.d, date_to=cls.d + timedelta(days=5),
+            status=Booking.CONFIRMED,
+        )
+        Booking.objects.create(
+            ad=cls.ad, tenant=cls.tenant,
+            date_from=cls.d + timedelta(days=10), date_to=cls.d + timedelta(days=12),
+            status=Booking.PENDING,
+        )
+
+        class DummyReq:
+            user = User.objects.create_user(email="batch@example.com", password="x")
+
+        cls.batch_request = DummyReq()
+
+    def test_validate_many_single_query(self):
+        d = self.d
+        candidates = [
+            (self.ad.id, d - timedelta(days=3), d - timedelta(days=1)),   # before
+            (self.ad.id, d - timedelta(days=2), d),                       # touches start
+            (self.ad.id, d + timedelta(days=1), d + timedelta(days=2)),   # inside
+            (self.ad.id, d + timedelta(days=5), d + timedelta(days=7)),   # touches end
+            (self.ad.id, d + timedelta(days=10), d + timedelta(days=11)), # only pending there
+            (self.ad2.id, d, d + timedelta(days=5)),                      # other ad
+        ]
+        with self.assertNumQueries(1):
+            flags = BookingBulkValidator().validate_many(candidates)
+        self.assertEqual(flags, [False, True, True, True, False, False])
+
+    def test_exclude_ids(self):
+        v = BookingBulkValidator(exclude_ids=[self.confirmed.id])
+        self.assertFalse(v.overlaps(self.ad.id, self.d, self.d + timedelta(days=1)))
+
+    def test_batch_serializer_reports_overlap_per_item(self):
+        d = self.d
+        s = BookingSerializer(
+            data=[
+                {"ad": self.ad.id, "date_from": d + timedelta(days=6), "date_to": d + timedelta(days=8)},
+                {"ad": self.ad.id, "date_from": d + timedelta(days=2), "date_to": d + timedelta(days=7)},
+                {"ad": self.ad2.id, "date_from": d, "date_to": d + timedelta(days=2)},
+            ],
+            many=True,
+            context={"request": self.batch_request},
+        )
+        # one confirmed-ranges load + the `ad` lookup per item; the per-row
+        # overlap query would add one more per item that reaches it
+        with self.assertNumQueries(1 + 3):
+            self.assertFalse(s.is_valid())
+        self.assertEqual(s.errors[0], {})
+        self.assertIn("non_field_errors", s.errors[1])
+        self.assertEqual(s.errors[2], {})
@@ -1,22 +1,18 @@
 from datetime import date, timedelta
 from django.contrib.auth import get_user_model
-from django.test import TestCase
-from rest_framework.test import APIClient
-from src.ads.models import Ad, Booking
+from rest_framework.test import APITestCase
+from src.ads.models import Booking
+from src.ads.factories import AdFactory
 
-class BookingPermissionsTests(TestCase):
+class BookingPermissionsTests(APITestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         User = get_user_model()
-        self.owner = User.objects.create_user(email="o@example.com", password="x")
-        self.tenant = User.objects.create_user(email="t@example.com", password="x")
-        self.other = User.objects.create_user(email="z@example.com", password="x")
-        self.ad = Ad.objects.create(
-            title="Ad", description="desc", location="Berlin",
-            price=100, rooms=2, housing_type="apartment",
-            is_active=True, owner=self.owner
-        )
-        self.client = APIClient()
+        cls.owner = User.objects.create_user(email="o@example.com", password="x")
+        cls.tenant = User.objects.create_user(email="t@example.com", password="x")
+        cls.other = User.objects.create_user(email="z@example.com", password="x")
+        cls.ad = AdFactory(owner=cls.owner, title="Ad")
 
     def _make_booking(self, tenant, status=Booking.PENDING, df=None, dt=None):
         df = df or (date.today() + timedelta(days=5))
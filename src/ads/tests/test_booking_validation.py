@@ -1,37 +1,56 @@
 from datetime import date, timedelta
 from django.contrib.auth import get_user_model
-from django.test import TestCase
-from src.ads.models import Ad, Booking
+from django.test import SimpleTestCase, TestCase
+from rest_framework import serializers
+from src.ads.models import Booking
 from src.ads.serializers import BookingSerializer
+from src.ads.factories import AdFactory
 
-class BookingValidationTests(TestCase):
+class BookingValidationNoDbTests(SimpleTestCase):
+    """
+    Rules that fail before the overlap query: validate() is called directly
+    with unsaved objects, so no database (or transaction) is involved.
+    """
 
     def setUp(self):
         User = get_user_model()
-        self.owner = User.objects.create_user(email="owner@example.com", password="x")
-        self.tenant = User.objects.create_user(email="tenant@example.com", password="x")
+        self.owner = User(id=1, email="owner@example.com")
+        self.tenant = User(id=2, email="tenant@example.com")
+        self.ad = AdFactory.build(owner=self.owner)
 
-        self.ad_active = Ad.objects.create(
-            title="Active Ad",
-            description="desc",
-            location="Berlin",
-            price=100,
-            rooms=2,
-            housing_type="apartment",
-            is_active=True,
-            owner=self.owner,
-        )
+    def _errors(self, user, date_from, date_to):
+        class DummyReq:
+            def __init__(self, u):
+                self.user = u
+        s = BookingSerializer(context={"request": DummyReq(user)})
+        with self.assertRaises(serializers.ValidationError) as cm:
+            s.validate({"ad": self.ad, "date_from": date_from, "date_to": date_to})
+        return cm.exception.detail
 
-        self.ad_inactive = Ad.objects.create(
-            title="Inactive Ad",
-            description="desc",
-            location="Berlin",
-            price=100,
-            rooms=2,
-            housing_type="apartment",
-            is_active=False,
-            owner=self.owner,
-        )
+    def test_date_order_required(self):
+        df = date.today()
+        errors = self._errors(self.tenant, df, df)  # invalid: same day
+        self.assertIn("date_to", errors)
+
+    def test_cannot_book_own_ad(self):
+        df = date.today() + timedelta(days=1)
+        errors = self._errors(self.owner, df, df + timedelta(days=2))  # owner books own ad
+        self.assertIn("non_field_errors", errors)
+
+
+class BookingValidationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(email="owner@example.com", password="x")
+        cls.tenant = User.objects.create_user(email="tenant@example.com", password="x")
+        # Extra tenants for the overlap tests
+        cls.other1 = User.objects.create_user(email="other@example.com", password="x")
+        cls.other2 = User.objects.create_user(email="ok@example.com", password="x")
+
+        cls.ad_active = AdFactory(owner=cls.owner, title="Active Ad")
+        cls.ad_inactive = AdFactory(owner=cls.owner, title="Inactive Ad", is_active=False)
 
     def _ctx(self, user):
         class DummyReq:
@@ -39,16 +58,6 @@ class BookingValidationTests(TestCase):
                 self.user = u
         return {"request": DummyReq(user)}
 
-    def test_date_order_required(self):
-        df = date.today()
-        dt = df  # invalid: same day
-        s = BookingSerializer(
-            data={"ad": self.ad_active.id, "date_from": df, "date_to": dt},
-            context=self._ctx(self.tenant),
-        )
-        self.assertFalse(s.is_valid())
-        self.assertIn("date_to", s.errors)
-
     def test_cannot_book_inactive_ad(self):
         df = date.today()
         dt = df + timedelta(days=2)
@@ -59,16 +68,6 @@ class BookingValidationTests(TestCase):
         self.assertFalse(s.is_valid())
         self.assertIn("ad", s.errors)
 
-    def test_cannot_book_own_ad(self):
-        df = date.today()
-        dt = df + timedelta(days=2)
-        s = BookingSerializer(
-            data={"ad": self.ad_active.id, "date_from": df, "date_to": dt},
-            context=self._ctx(self.owner),  # owner tries to book own ad
-        )
-        self.assertFalse(s.is_valid())
-        self.assertIn("non_field_errors", s.errors)
-
     def test_overlap_is_rejected(self):
         # Existing confirmed booking
         df = date.today() + timedelta(days=5)
@@ -85,7 +84,7 @@ class BookingValidationTests(TestCase):
                 "date_from": df + timedelta(days=2),
                 "date_to": dt + timedelta(days=2),
             },
-            context=self._ctx(get_user_model().objects.create_user(email="other@example.com", password="x")),
+            context=self._ctx(self.other1),
         )
         self.assertFalse(s.is_valid())
         self.assertIn("non_field_errors", s.errors)
@@ -105,6 +104,6 @@ class BookingValidationTests(TestCase):
                 "date_from": dt + timedelta(days=1),
                 "date_to": dt + timedelta(days=3),
             },
-            context=self._ctx(get_user_model().objects.create_user(email="ok@example.com", password="x")),
+            context=self._ctx(self.other2),
         )
         self.assertTrue(s.is_valid(), msg=s.errors)
@@ -1,26 +1,25 @@
 from datetime import date, timedelta
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
 from django.test import TestCase
 from rest_framework.test import APIClient
-from src.ads.models import Ad, Booking
+from src.ads.models import Booking
+from src.ads.serializers import ReviewSerializer
+from src.ads.factories import AdFactory
 
 class ReviewRulesTests(TestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         User = get_user_model()
-        self.owner = User.objects.create_user(email="owner@example.com", password="x")
-        self.tenant = User.objects.create_user(email="tenant@example.com", password="x")
-        self.other = User.objects.create_user(email="other@example.com", password="x")
-        self.ad = Ad.objects.create(
-            title="Nice flat",
-            description="desc",
-            location="Berlin",
-            price=100,
-            rooms=2,
-            housing_type="apartment",
-            is_active=True,
-            owner=self.owner,
-        )
+        cls.owner = User.objects.create_user(email="owner@example.com", password="x")
+        cls.tenant = User.objects.create_user(email="tenant@example.com", password="x")
+        cls.other = User.objects.create_user(email="other@example.com", password="x")
+        cls.ad = AdFactory(owner=cls.owner, title="Nice flat")
+
+    def setUp(self):
         self.client = APIClient()
 
     def _login(self, who):
@@ -89,6 +88,37 @@ class ReviewRulesTests(TestCase):
         self.assertEqual(r2.status_code, 400)
         self.assertIn("detail", r2.data)
 
+    def test_second_review_for_same_booking_keeps_detail_shape(self):
+        self._login(self.tenant)
+        today = date.today()
+        booking = Booking.objects.create(
+            ad=self.ad, tenant=self.tenant,
+            date_from=today - timedelta(days=5), date_to=today - timedelta(days=2),
+            status=Booking.CONFIRMED,
+        )
+        payload = {"booking": booking.id, "rating": 5}
+        self.assertEqual(self.client.post("/api/reviews/", payload, format="json").status_code, 201)
+
+        r = self.client.post("/api/reviews/", payload, format="json")
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(str(r.data["detail"]), "This booking is already reviewed.")
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        today = date.today()
+        booking = Booking.objects.create(
+            ad=self.ad, tenant=self.tenant,
+            date_from=today - timedelta(days=5), date_to=today - timedelta(days=2),
+            status=Booking.CONFIRMED,
+        )
+        request = mock.Mock(user=self.tenant)
+        s = ReviewSerializer(context={"request": request})
+        with mock.patch(
+            "rest_framework.serializers.ModelSerializer.create",
+            side_effect=IntegrityError("fk violation"),
+        ):
+            with self.assertRaises(IntegrityError):
+                s.create({"booking": booking, "rating": 5})
+
     def test_owner_cannot_review_own_ad(self):
         """Owner shouldn't be able to review their own ad (no eligible booking)."""
         self._login(self.owner)
@@ -6,28 +6,27 @@ from rest_framework.test import APIClient
 from django.test.utils import override_settings
 from django.conf import settings
 
-from src.ads.models import Ad, Booking, Review
+from src.ads.models import Booking, Review
+from src.ads.factories import AdFactory
 
 User = get_user_model()
 
+pytestmark = pytest.mark.django_db(transaction=False)
 
-@pytest.mark.django_db
+
+@pytest.mark.usefixtures("class_rows")
 class TestReviewsByBooking:
+    @classmethod
+    def build_rows(cls):
+        # Bookings stay per test because the tests add and delete them
+        cls.owner = User.objects.create_user(email="owner@example.com", password="p")
+        cls.tenant = User.objects.create_user(email="tenant@example.com", password="p")
+        cls.ad = AdFactory(
+            owner=cls.owner, title="Flat", description="x", price=1000, housing_type="wohnung"
+        )
+
     def setup_method(self):
         self.client = APIClient()
-        self.owner = User.objects.create_user(email="owner@example.com", password="p")
-        self.tenant = User.objects.create_user(email="tenant@example.com", password="p")
-
-        self.ad = Ad.objects.create(
-            title="Flat",
-            description="x",
-            location="Berlin",
-            price=1000,
-            rooms=2,
-            housing_type="wohnung",
-            is_active=True,
-            owner=self.owner,
-        )
 
         today = date.today()
         self.d1 = today - timedelta(days=10)
@@ -35,11 +34,14 @@ class TestReviewsByBooking:
         self.d3 = today - timedelta(days=5)
         self.d4 = today - timedelta(days=2)
 
-        # Two finished CONFIRMED bookings by the same tenant for same ad
-        self.b1 = Booking.objects.create(ad=self.ad, tenant=self.tenant, status=Booking.CONFIRMED,
-                                         date_from=self.d1, date_to=self.d2)
-        self.b2 = Booking.objects.create(ad=self.ad, tenant=self.tenant, status=Booking.CONFIRMED,
-                                         date_from=self.d3, date_to=self.d4)
+        # Two finished CONFIRMED bookings by the same tenant for same ad (one INSERT).
+        # MySQL returns no ids from bulk_create, so tests identify them by dates.
+        Booking.objects.bulk_create([
+            Booking(ad=self.ad, tenant=self.tenant, status=Booking.CONFIRMED,
+                    date_from=self.d1, date_to=self.d2),
+            Booking(ad=self.ad, tenant=self.tenant, status=Booking.CONFIRMED,
+                    date_from=self.d3, date_to=self.d4),
+        ])
 
     def _auth(self, user):
         self.client.force_authenticate(user=user)
@@ -58,18 +60,18 @@ class TestReviewsByBooking:
         # Authenticate as tenant
         self._auth(self.tenant)
 
-        # First review should bind to the latest finished confirmed booking (b2)
+        # First review should bind to the latest finished confirmed booking (d3..d4)
         r1 = self.client.post("/api/reviews/", {"ad": self.ad.id, "rating": 5, "comment": "Good"}, format="json")
         assert r1.status_code in (200, 201), r1.data
-        rev1 = Review.objects.get(pk=r1.data["id"])
-        assert rev1.booking_id == self.b2.id
+        rev1 = Review.objects.select_related("booking").get(pk=r1.data["id"])
+        assert rev1.booking.date_from == self.d3
         assert rev1.text == "Good"
 
-        # Second review should bind to the previous finished booking (b1)
+        # Second review should bind to the previous finished booking (d1..d2)
         r2 = self.client.post("/api/reviews/", {"ad": self.ad.id, "rating": 4, "text": "Ok"}, format="json")
         assert r2.status_code in (200, 201), r2.data
-        rev2 = Review.objects.get(pk=r2.data["id"])
-        assert rev2.booking_id == self.b1.id
+        rev2 = Review.objects.select_related("booking").get(pk=r2.data["id"])
+        assert rev2.booking.date_from == self.d1
         assert rev2.text == "Ok"
 
         # Third attempt -> no eligible bookings left -> expect business 400 (not 429)
@@ -4,16 +4,16 @@ from src.ads.models import SearchQuery
 
 class SearchTopTests(TestCase):
 
+    @classmethod
+    def setUpTestData(cls):
+        # three 'berlin', two 'paris', one 'rome' -- one INSERT, distinct instances
+        SearchQuery.objects.bulk_create(
+            [SearchQuery(q=q, filters={}) for q in ["berlin"] * 3 + ["paris"] * 2 + ["rome"]]
+        )
+
     def setUp(self):
         self.client = APIClient()
 
-        # three 'berlin', two 'paris', one 'rome'
-        for _ in range(3):
-            SearchQuery.objects.create(q="berlin", filters={})
-        for _ in range(2):
-            SearchQuery.objects.create(q="paris", filters={})
-        SearchQuery.objects.create(q="rome", filters={})
-
     # empty q should be ignored by (exclude(q=''))
 
     def test_limit_and_order(self):
@@ -1,10 +1,13 @@
 from django.conf import settings
+from django.core.cache import cache
 from django.test import override_settings
 from django.urls import reverse
+from rest_framework.settings import api_settings
 from rest_framework.test import APITestCase
+from rest_framework.throttling import SimpleRateThrottle
 from django.contrib.auth import get_user_model
 
-from src.ads.models import Ad
+from src.ads.factories import AdFactory
 
 # For tests we only *lower the rates* for the specific scopes we hit.
 # We must MERGE into existing REST_FRAMEWORK so that throttle classes remain enabled.
@@ -23,53 +26,62 @@ RF_MERGED = {
 }
 
 
+class _ThrottleTestCase(APITestCase):
+    """
+    DRF copies DEFAULT_THROTTLE_RATES onto SimpleRateThrottle once, at import;
+    an override made for these tests must not outlive them (and must not be
+    missed because the copy was taken earlier). Each test pins the overridden
+    rates on the class and puts the previous dict back afterwards.
+    """
+
+    def setUp(self):
+        saved_rates = SimpleRateThrottle.THROTTLE_RATES
+        SimpleRateThrottle.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        self.addCleanup(setattr, SimpleRateThrottle, "THROTTLE_RATES", saved_rates)
+        # Throttle history lives in the cache; start every test from zero
+        cache.clear()
+
+    def _expect_throttled(self, method, url, payload=None):
+        """Same request three times (limit is 2/min); the last one must be 429."""
+        send = getattr(self.client, method)
+        args = (payload,) if payload is not None else ()
+        responses = [send(url, *args) for _ in range(3)]
+        self.assertEqual(responses[-1].status_code, 429)
+        return responses
+
+
 @override_settings(REST_FRAMEWORK=RF_MERGED)
-class AdsThrottleTests(APITestCase):
+class AdsThrottleTests(_ThrottleTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(email="owner@example.com", password="x")
+        cls.ad = AdFactory(owner=cls.owner, title="Test Ad", rooms=1)
+        cls.url_list = reverse("ads:ad-list")
+        cls.url_availability = reverse("ads:ad-availability", args=[cls.ad.id])
 
     def test_ads_list_throttling(self):
         """Third anonymous GET to ad-list should be throttled (429)."""
-        url = reverse("ads:ad-list")
-        r1 = self.client.get(url)
-        self.assertEqual(r1.status_code, 200)
-        r2 = self.client.get(url)
-        self.assertEqual(r2.status_code, 200)
-        r3 = self.client.get(url)
-        self.assertEqual(r3.status_code, 429)
+        r1, r2, _ = self._expect_throttled("get", self.url_list)
+        self.assertEqual([r1.status_code, r2.status_code], [200, 200])
 
     def test_availability_throttling(self):
         """Third anonymous GET to ad-availability should be throttled (429)."""
-        User = get_user_model()
-        owner = User.objects.create_user(email="owner@example.com", password="x")
-        ad = Ad.objects.create(
-            title="Test Ad",
-            description="desc",
-            location="Berlin",
-            price=100,
-            rooms=1,
-            housing_type="apartment",
-            is_active=True,
-            owner=owner,
-        )
-        url = reverse("ads:ad-availability", args=[ad.id])
-        r1 = self.client.get(url)
-        self.assertEqual(r1.status_code, 200)
-        r2 = self.client.get(url)
-        self.assertEqual(r2.status_code, 200)
-        r3 = self.client.get(url)
-        self.assertEqual(r3.status_code, 429)
+        r1, r2, _ = self._expect_throttled("get", self.url_availability)
+        self.assertEqual([r1.status_code, r2.status_code], [200, 200])
 
 
 @override_settings(REST_FRAMEWORK=RF_MERGED)
-class AuthThrottleTests(APITestCase):
+class AuthThrottleTests(_ThrottleTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.url_login = reverse("token_obtain_pair")
 
     def test_login_throttling(self):
         """Third POST with wrong creds should be throttled (429) on auth_login scope."""
-        url = reverse("token_obtain_pair")
         payload = {"email": "nonexistent@example.com", "password": "wrongpassword"}
-
-        r1 = self.client.post(url, payload)
-        self.assertEqual(r1.status_code, 401)  # wrong creds
-        r2 = self.client.post(url, payload)
-        self.assertEqual(r2.status_code, 401)
-        r3 = self.client.post(url, payload)
-        self.assertEqual(r3.status_code, 429)
+        r1, r2, _ = self._expect_throttled("post", self.url_login, payload)
+        # wrong creds
+        self.assertEqual([r1.status_code, r2.status_code], [401, 401])
@@ -1,27 +1,40 @@
+from rest_framework.settings import api_settings
 from rest_framework.throttling import ScopedRateThrottle
 
-class AdsListThrottle(ScopedRateThrottle):
+class ScopedRateThrottleIsolated(ScopedRateThrottle):
+    """
+    Scoped throttle that resolves its rate from the live DRF settings.
+
+    SimpleRateThrottle.THROTTLE_RATES is a copy of DEFAULT_THROTTLE_RATES taken
+    when rest_framework.throttling is first imported, so overrides applied later
+    (override_settings in tests, settings reloads) would otherwise be ignored,
+    or, if the import happened under an override, leak into everything after it.
+    The resolved rate is also part of the cache key, so counters kept under
+    one rate are never read back under another.
+    """
+    def get_rate(self):
+        # api_settings is reloaded by DRF on setting_changed; the class copy is not
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def get_cache_key(self, request, view):
+        key = super().get_cache_key(request, view)
+        if key is None:
+            return None
+        # allow_request() has already resolved self.rate for this scope
+        return f"{key}:{self.rate or 'none'}"
+
+class AdsListThrottle(ScopedRateThrottleIsolated):
     scope = "ads_list"
 
-class AdsRetrieveThrottle(ScopedRateThrottle):
+class AdsRetrieveThrottle(ScopedRateThrottleIsolated):
     scope = "ads_retrieve"
 
-class AdsAvailabilityThrottle(ScopedRateThrottle):
+class AdsAvailabilityThrottle(ScopedRateThrottleIsolated):
     scope = "ads_availability"
 
-class AdImageUploadThrottle(ScopedRateThrottle):
+class AdImageUploadThrottle(ScopedRateThrottleIsolated):
     scope = "adimage_upload"
 
-class AdImageReplaceThrottle(ScopedRateThrottle):
+class AdImageReplaceThrottle(ScopedRateThrottleIsolated):
     scope = "adimage_replace"
-
-class ScopedRateThrottleIsolated(ScopedRateThrottle):
-    """
-    Include the resolved rate in the cache key to avoid collisions
-    when tests or environments override DEFAULT_THROTTLE_RATES.
-    """
-    def get_cache_key(self, request, view):
-        key = super().get_cache_key(request, view)
-        if key is None:
-            return None
-        return f"{key}:{self.get_rate() or 'none'}"
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+Storage writes for multi-file image uploads.
+
+Each file write is a separate storage call (a disk write locally, an HTTP PUT on
+remote storages). The writes are I/O bound and independent, so they run on a
+few threads; the AdImage rows are then inserted by the caller in one
+transaction. Database work never leaves the request thread.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .models import AdImage
+
+
+def _store(image, upload):
+    # save=False: only the file goes to storage; the row is saved by the caller
+    image.image.save(upload.name, upload, save=False)
+    return image
+
+
+def store_ad_images(ad, uploads, caption=""):
+    """
+    Write every upload to storage and return unsaved AdImage instances whose
+    files are already committed (FileField.pre_save will not write them again).
+    If any write fails, the files already written are deleted before the error
+    is re-raised. AD_IMAGE_UPLOAD_WORKERS = 0 keeps the writes sequential.
+    """
+    images = [AdImage(ad=ad, caption=caption) for _ in uploads]
+    workers = min(getattr(settings, "AD_IMAGE_UPLOAD_WORKERS", 0), len(uploads))
+    try:
+        if workers <= 1:
+            for img, f in zip(images, uploads):
+                _store(img, f)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="adimage-upload") as pool:
+                futures = [pool.submit(_store, img, f) for img, f in zip(images, uploads)]
+            # leaving the pool waited for every write, so none is still in flight
+            for future in futures:
+                future.result()
+    except Exception:
+        # only successful writes have a name set
+        discard_stored_images(images)
+        raise
+    return images
+
+
+def discard_stored_images(images):
+    """Remove files written by store_ad_images when their rows were not saved."""
+    for img in images:
+        if img.image.name:
+            img.image.storage.delete(img.image.name)
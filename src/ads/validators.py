@@ -1,10 +1,55 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from PIL import Image, UnidentifiedImageError
 
 # Requires Pillow
 BYTES_IN_MB = 1024 * 1024
 
+# Leading bytes of common image formats (Pillow format names). Only signatures
+# long enough to be unambiguous: BMP's 2-byte "BM" would also match text and
+# other junk, so BMP is left to Pillow.
+_MAGIC = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"II*\x00", "TIFF"),
+    (b"MM\x00*", "TIFF"),
+)
+
+
+def _sniff_format(head):
+    """Format name from the first 12 bytes, or None if not recognised."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    return None
+
+
+def _load_limits():
+    """Resolve the AD_IMAGE_* settings once instead of on every upload."""
+    global _MAX_MB, _MAX_BYTES, _ALLOWED, _ALLOWED_LABEL, _MAX_W, _MAX_H
+    _MAX_MB = int(getattr(settings, "AD_IMAGE_MAX_MB", 5))
+    _MAX_BYTES = _MAX_MB * BYTES_IN_MB
+    _ALLOWED = frozenset(getattr(settings, "AD_IMAGE_ALLOWED_FORMATS", {"JPEG", "PNG", "WEBP"}))
+    _ALLOWED_LABEL = ", ".join(sorted(_ALLOWED))
+    _MAX_W = int(getattr(settings, "AD_IMAGE_MAX_WIDTH", 6000))
+    _MAX_H = int(getattr(settings, "AD_IMAGE_MAX_HEIGHT", 6000))
+
+
+_load_limits()
+
+
+@receiver(setting_changed)
+def _reload_limits(sender, setting, **kwargs):
+    # keeps override_settings(AD_IMAGE_...) working in tests
+    if setting.startswith("AD_IMAGE_"):
+        _load_limits()
+
 
 def validate_image_file(uploaded_file):
     """
@@ -15,37 +60,38 @@ def validate_image_file(uploaded_file):
     Leaves the file pointer at position 0 for subsequent saving.
     """
     # 1) file size
-    max_mb = int(getattr(settings, 'AD_IMAGE_MAX_MB', 5))
-    max_bytes = max_mb * 1024 * 1024
-    if uploaded_file.size > max_bytes:
-        raise ValidationError(f"File too large: max {max_mb} MB")
+    if uploaded_file.size > _MAX_BYTES:
+        raise ValidationError(f"File too large: max {_MAX_MB} MB")
+
+    # 2a) cheap reject: a recognised but disallowed format never reaches Pillow.
+    #     Unknown signatures fall through so Pillow reports them as before.
+    uploaded_file.seek(0)
+    hint = _sniff_format(uploaded_file.read(12))
+    if hint is not None and hint not in _ALLOWED:
+        raise ValidationError(f"Unsupported format: {hint}. Allowed: {_ALLOWED_LABEL}")
 
-    # 2) format & integrity
+    # 2b) format & integrity: one open; format and size come from the header,
+    #     so read them before verify() consumes the image
     try:
         uploaded_file.seek(0)
         img = Image.open(uploaded_file)
+        fmt = (img.format or "").upper()
+        w, h = img.size
         img.verify()  # integrity check
-    except UnidentifiedImageError:
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        # a plugin that accepted the prefix may still fail on the header
+        # (e.g. BMP: "Unsupported BMP header type" is a plain OSError)
         raise ValidationError("Unsupported or corrupted image")
 
-    # verify() closes the fp; reopen to read size/format
-    uploaded_file.seek(0)
-    img = Image.open(uploaded_file)
-
-    fmt = (img.format or "").upper()
     if fmt == "JPG":
         fmt = "JPEG"
 
-    allowed = set(getattr(settings, "AD_IMAGE_ALLOWED_FORMATS", {"JPEG", "PNG", "WEBP"}))
-    if fmt not in allowed:
-        raise ValidationError(f"Unsupported format: {fmt}. Allowed: {', '.join(sorted(allowed))}")
+    if fmt not in _ALLOWED:
+        raise ValidationError(f"Unsupported format: {fmt}. Allowed: {_ALLOWED_LABEL}")
 
     # 3) dimensions
-    w, h = img.size
-    max_w = int(getattr(settings, "AD_IMAGE_MAX_WIDTH", 6000))
-    max_h = int(getattr(settings, "AD_IMAGE_MAX_HEIGHT", 6000))
-    if w > max_w or h > max_h:
-        raise ValidationError(f"Image too large: {w}x{h}px (max {max_w}x{max_h}px)")
+    if w > _MAX_W or h > _MAX_H:
+        raise ValidationError(f"Image too large: {w}x{h}px (max {_MAX_W}x{_MAX_H}px)")
 
     # reset fp for saving in the storage
     uploaded_file.seek(0)
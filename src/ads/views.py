@@ -1,5 +1,6 @@
 import logging
-from django.db.models import Q, Avg, Count, Exists, OuterRef
+from django.db import transaction
+from django.db.models import Q, Count, Exists, OuterRef, Prefetch
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django_filters import rest_framework as df
@@ -10,7 +11,6 @@ from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import serializers as rf_serializers
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 from drf_spectacular.utils import (
     extend_schema_view, extend_schema, OpenApiParameter, OpenApiTypes,
@@ -18,10 +18,13 @@ from drf_spectacular.utils import (
 )
 from django.utils import timezone
 from django.utils.dateparse import parse_date
+from django.utils.http import parse_etags, quote_etag
 from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
 from datetime import timedelta
+from functools import reduce
 from hashlib import blake2b
+from operator import and_, or_
 
 from .models import Ad, Booking, AdImage, Review, SearchQuery, AdView
 from .serializers import (
@@ -31,7 +34,10 @@ from .serializers import (
 from .permissions import (
     IsAdOwnerOrReadOnly, IsBookingOwnerOrAdOwner, IsReviewOwnerOrAdmin
 )
+from .caching import ads_list_version
 from .pagination import AdPagination
+from .services import BookingOverlapError, confirm_booking
+from .uploads import discard_stored_images, store_ad_images
 from .validators import validate_image_file
 from .throttling import ScopedRateThrottleIsolated
 
@@ -41,13 +47,19 @@ logger = logging.getLogger(__name__)
 # -------------------------
 # Filters for Ads (readable labels + smart search 'q')
 # -------------------------
+# 'q' limits: each term costs four LIKE '%term%' scans
+Q_MAX_TERMS = 8
+Q_MIN_TERM_LEN = 3
+# columns searched by 'q' (any of them may match a term)
+_AD_Q_COLS = ('title', 'description', 'location', 'housing_type')
+
 class AdFilter(df.FilterSet):
     price_min    = df.NumberFilter(field_name='price', lookup_expr='gte', label='Price min')
     price_max    = df.NumberFilter(field_name='price', lookup_expr='lte', label='Price max')
     rooms_min    = df.NumberFilter(field_name='rooms', lookup_expr='gte', label='Rooms min')
     rooms_max    = df.NumberFilter(field_name='rooms', lookup_expr='lte', label='Rooms max')
     location     = df.CharFilter(field_name='location', lookup_expr='icontains', label='Location (contains)')
-    housing_type = df.CharFilter(field_name='housing_type', lookup_expr='iexact', label='Housing type (exact)')
+    housing_type = df.CharFilter(method='filter_housing_type', label='Housing type (exact)')
     area_min     = df.NumberFilter(field_name='area', lookup_expr='gte', label='Area min (m²)')
     area_max     = df.NumberFilter(field_name='area', lookup_expr='lte', label='Area max (m²)')
     lat_min = df.NumberFilter(field_name='latitude', lookup_expr='gte', label='Latitude min')
@@ -63,27 +75,32 @@ class AdFilter(df.FilterSet):
     available_to   = df.DateFilter(method='filter_available', label='Available to (YYYY-MM-DD)')
 
     def filter_q(self, queryset, name, value):
-        terms = [t.strip() for t in (value or "").split() if t.strip()]
-        for term in terms:
-            queryset = queryset.filter(
-                Q(title__icontains=term) |
-                Q(description__icontains=term) |
-                Q(location__icontains=term) |
-                Q(housing_type__icontains=term)
-            )
-        return queryset
+        # case-insensitive dedup, short tokens dropped, bounded number of LIKEs
+        terms = list(dict.fromkeys(
+            t.lower() for t in (value or "").split() if len(t) >= Q_MIN_TERM_LEN
+        ))[:Q_MAX_TERMS]
+        if not terms:
+            # typed something, but nothing searchable: match nothing, not everything
+            return queryset.none() if value.strip() else queryset
+        # every term must match one of the columns; one flat WHERE, one clone
+        return queryset.filter(reduce(and_, (
+            reduce(or_, (Q(**{f'{col}__icontains': term}) for col in _AD_Q_COLS))
+            for term in terms
+        )))
+
+    def filter_housing_type(self, queryset, name, value):
+        # stored values are the lowercase HousingType choices (the serializer
+        # enforces them), so a plain equality on the indexed column is enough
+        return queryset.filter(housing_type=value.strip().lower())
 
     def filter_mine(self, queryset, name, value):
         """Return only ads owned by the current authenticated user."""
         if not value:  # mine не запрошен
             return queryset
-
-        req = getattr(self, 'request', None)
-        user = getattr(req, 'user', None)
-
-        if not user or not user.is_authenticated:
+        # DjangoFilterBackend always binds the DRF request
+        user = self.request.user
+        if not user.is_authenticated:
             return queryset.none()
-
         return queryset.filter(owner=user)
 
     def filter_rating_min(self, queryset, name, value):
@@ -167,7 +184,11 @@ class AdFilter(df.FilterSet):
             OpenApiParameter(
                 name="q",
                 type=OpenApiTypes.STR,
-                description="Smart search in title/description/location/housing_type",
+                description=(
+                    "Smart search in title/description/location/housing_type. "
+                    "Terms are case-insensitive and ANDed; duplicates and terms shorter "
+                    "than 3 characters are ignored, at most 8 terms are used."
+                ),
                 examples=[
                     OpenApiExample("Single term", value="berlin"),
                     OpenApiExample("Multiple terms (AND)", value="berlin balcony"),
@@ -230,7 +251,7 @@ class AdFilter(df.FilterSet):
             OpenApiParameter(
                 name="housing_type",
                 type=OpenApiTypes.STR,
-                description="Filter by housing type (iexact)",
+                description="Filter by housing type (case-insensitive exact match)",
                 examples=[OpenApiExample("Exact type", value="apartment")]
             ),
             OpenApiParameter(
@@ -272,6 +293,16 @@ class AdFilter(df.FilterSet):
                 description="Items per page (<=50)",
                 examples=[OpenApiExample("20 per page", value=20)]
             ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Opaque cursor from `next`/`previous`; pass it empty to start. "
+                    "Switches to keyset pagination, newest first "
+                    "(no `count`; `page` and `ordering` are ignored)."
+                ),
+                examples=[OpenApiExample("First cursor page", value="")],
+            ),
             OpenApiParameter(
                 name="mine",
                 type=OpenApiTypes.BOOL,
@@ -362,16 +393,22 @@ class AdViewSet(viewsets.ModelViewSet):
         Base queryset with aggregates. Public users see only active ads.
         When ?mine=true and user is authenticated, include owner's inactive ads as well.
         """
-        qs = (
-            Ad.objects.all()
-            .annotate(
-                average_rating=Avg('reviews__rating'),
-                reviews_count=Count('reviews', distinct=True),
-                views_count=Count('views', distinct=True),
+        qs = Ad.objects.all()
+        # availability only needs the ad row (404 / active check), not images/reviews
+        if getattr(self, 'action', None) != 'availability':
+            # rating/reviews/views counters are columns on Ad (kept by signals)
+            qs = (
+                qs.select_related('owner')
+                .prefetch_related(
+                    'images',
+                    # AdSerializer.recent_reviews: newest 3 per ad, one query per page
+                    Prefetch(
+                        'reviews',
+                        queryset=Review.objects.select_related('tenant').order_by('-created_at')[:3],
+                        to_attr='recent_reviews_prefetched',
+                    ),
+                )
             )
-            .select_related('owner')
-            .prefetch_related('images')
-        )
 
         # Detect ?mine=true (truthy variants: 1,true,yes,on)
         try:
@@ -386,9 +423,36 @@ class AdViewSet(viewsets.ModelViewSet):
 
         return qs
 
-    # --- search logging (list) ---
+    # --- conditional GET + search logging (list) ---
+    def _list_etag(self, request):
+        """
+        Version token (bumped on any list-relevant write) + canonical query.
+        ?mine=... output depends on the caller, so their id is part of the tag.
+        Weak: the payload carries views_count, which can move without a bump,
+        so equal tags mean equivalent pages, not identical bytes.
+        """
+        params = sorted((k, v) for k in request.query_params for v in request.query_params.getlist(k))
+        user_part = request.user.pk if 'mine' in request.query_params else None
+        digest = blake2b(
+            f"{ads_list_version()}|{params}|{user_part}".encode('utf-8'), digest_size=16
+        ).hexdigest()
+        return 'W/' + quote_etag(digest)
+
     def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
+        etag = self._list_etag(request)
+        # If-None-Match uses the weak comparison: W/ is ignored on both sides
+        client_tags = {t.removeprefix('W/') for t in parse_etags(request.headers.get('If-None-Match', ''))}
+        if '*' in client_tags or etag.removeprefix('W/') in client_tags:
+            # client copy is current: no list query, no serialization
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        self._log_search(request)
+        return response
+
+    @staticmethod
+    def _log_search(request):
         try:
             params = request.query_params  # QueryDict
             q = (params.get('q') or '').strip()
@@ -396,6 +460,7 @@ class AdViewSet(viewsets.ModelViewSet):
                 filters_payload = dict(params.lists())
                 filters_payload.pop('page', None)
                 filters_payload.pop('page_size', None)
+                filters_payload.pop('cursor', None)
                 xff = (request.META.get('HTTP_X_FORWARDED_FOR') or '').split(',')[0].strip()
                 ip = xff or request.META.get('REMOTE_ADDR') or None
                 data = {
@@ -408,7 +473,6 @@ class AdViewSet(viewsets.ModelViewSet):
                 SearchQuery.objects.create(**data)
         except Exception as e:
             logger.warning("search logging failed: %s", e)
-        return response
 
     # --- view logging (retrieve) ---
     @staticmethod
@@ -431,10 +495,11 @@ class AdViewSet(viewsets.ModelViewSet):
         Authenticated: dedup by user within ADS_VIEW_DEDUP_HOURS (no IP stored).
         Anonymous: dedup by salted hashed IP within ADS_VIEW_DEDUP_HOURS (raw IP not stored).
         """
-        # 1) fetch the object (with annotations)
+        # 1) fetch the object
         obj = self.get_object()
 
         # 2) log the view (best-effort; never break the response)
+        logged = False
         try:
             hours = int(getattr(settings, 'ADS_VIEW_DEDUP_HOURS', 6))
             cutoff = timezone.now() - timedelta(hours=hours)
@@ -444,6 +509,7 @@ class AdViewSet(viewsets.ModelViewSet):
                 exists = AdView.objects.filter(ad=obj, user=request.user, created_at__gte=cutoff).exists()
                 if not exists:
                     AdView.objects.create(ad=obj, user=request.user, ip=None, anon_ip_hash=None, user_agent=ua)
+                    logged = True
             else:
                 xff = self._first_ip_from_xff(request.META.get('HTTP_X_FORWARDED_FOR', ''))
                 ip = xff or (request.META.get('REMOTE_ADDR') or '')
@@ -459,15 +525,25 @@ class AdViewSet(viewsets.ModelViewSet):
                     )
                     if not exists:
                         AdView.objects.create(ad=obj, user=None, anon_ip_hash=ip_hash, ip=None, user_agent=ua)
+                        logged = True
         except Exception:
             pass
 
-        # 3) re-fetch the object so annotated views_count includes the freshly created row
-        obj = self.get_queryset().get(pk=obj.pk)
+        # 3) the signal already bumped the column; mirror it instead of re-fetching
+        # the ad with its prefetches
+        if logged:
+            obj.views_count += 1
 
         serializer = self.get_serializer(obj)
         return Response(serializer.data)
 
+    def filter_queryset(self, queryset):
+        # List filters/ordering (may reference the aggregates) mean nothing for the
+        # bare availability lookup.
+        if getattr(self, 'action', None) == 'availability':
+            return queryset
+        return super().filter_queryset(queryset)
+
     def get_serializer_class(self):
         """Use dedicated serializer for upload_image action."""
         if getattr(self, 'action', None) == 'upload_image':
@@ -551,7 +627,17 @@ class AdViewSet(viewsets.ModelViewSet):
         if errors:
             return Response({"detail": "Invalid images", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        created = [AdImage.objects.create(ad=ad, image=f, caption=caption) for f in valid_files]
+        # Files go to storage first (in parallel), outside the transaction.
+        # Then one transaction for the rows: a single commit, and no partial set
+        # if a row fails. Not bulk_create: MySQL returns no ids for the response.
+        created = store_ad_images(ad, valid_files, caption)
+        try:
+            with transaction.atomic():
+                for img in created:
+                    img.save()
+        except Exception:
+            discard_stored_images(created)
+            raise
         return Response(AdImageSerializer(created, many=True, context={'request': request}).data,
                         status=status.HTTP_201_CREATED)
 
@@ -575,8 +661,8 @@ class AdViewSet(viewsets.ModelViewSet):
         """Return busy intervals for calendar (PENDING and/or CONFIRMED)."""
         ad = self.get_object()
 
-        # base queryset: busy bookings
-        qs = ad.bookings.filter(status__in=[Booking.PENDING, Booking.CONFIRMED])
+        # base queryset: busy bookings (only the three columns we return)
+        qs = Booking.objects.filter(ad_id=ad.pk, status__in=[Booking.PENDING, Booking.CONFIRMED])
 
         # optional filter by status
         status_param = (request.query_params.get('status') or '').upper().strip()
@@ -614,7 +700,9 @@ class AdViewSet(viewsets.ModelViewSet):
     destroy=extend_schema(summary="Delete review (author or staff)"),
 )
 class ReviewViewSet(viewsets.ModelViewSet):
-    queryset = Review.objects.select_related('ad', 'tenant').all()
+    # ReviewSerializer renders ad/tenant/booking as primary keys straight from
+    # the *_id columns, so no JOIN or prefetch is needed for list/detail.
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly, IsReviewOwnerOrAdmin)
     filter_backends = (df.DjangoFilterBackend, filters.OrderingFilter)
@@ -662,9 +750,9 @@ class ReviewViewSet(viewsets.ModelViewSet):
             raise ValidationError({"detail": "Only CONFIRMED bookings can be reviewed."})
         if booking.date_to >= today:
             raise ValidationError({"detail": "You can review only after the stay has ended."})
-        if Review.objects.filter(booking=booking).exists():
-            raise ValidationError({"detail": "This booking is already reviewed."})
 
+        # "One review per booking" is enforced by the unique booking column;
+        # ReviewSerializer.create turns the IntegrityError into a 400.
         serializer.save(tenant=user, ad=ad, booking=booking)
 
 
@@ -706,7 +794,7 @@ class AdImageViewSet(viewsets.ModelViewSet):
     filterset_fields = ('ad',)
 
     # Per-action throttling
-    throttle_classes = (ScopedRateThrottle,)
+    throttle_classes = (ScopedRateThrottleIsolated,)
 
     def get_throttles(self):
         scope_map = {
@@ -886,7 +974,7 @@ class BookingViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'head', 'options']
 
     # Per-action throttling
-    throttle_classes = (ScopedRateThrottle,)
+    throttle_classes = (ScopedRateThrottleIsolated,)
 
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
@@ -909,9 +997,13 @@ class BookingViewSet(viewsets.ModelViewSet):
         - incoming=true     — owner's inbox: only PENDING bookings for the owner's ads
         """
         user = self.request.user
+        # Owner side as a subquery on ads_ad.owner_id: each branch of the OR is an
+        # index lookup (tenant_id / ad_id IN ...), not a filter over the joined row.
+        # Not UNION: get_object() and the filters below still need .filter().
+        own_ads = Ad.objects.filter(owner=user).values("pk")
         qs = (
             Booking.objects
-            .filter(Q(tenant=user) | Q(ad__owner=user))
+            .filter(Q(tenant=user) | Q(ad_id__in=own_ads))
             .select_related("ad", "ad__owner", "tenant")
         )
 
@@ -1047,7 +1139,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         ),
         responses={
             200: OpenApiResponse(description="Booking confirmed"),
-            400: OpenApiResponse(description="Invalid current status (not PENDING)"),
+            400: OpenApiResponse(description="Invalid current status (not PENDING) or overlap with a confirmed booking"),
             403: OpenApiResponse(description="Forbidden (not the ad owner)"),
             404: OpenApiResponse(description="Not found"),
         },
@@ -1062,14 +1154,13 @@ class BookingViewSet(viewsets.ModelViewSet):
                 {'detail': f'Only PENDING bookings can be confirmed (current: {booking.status}).'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        booking.status = Booking.CONFIRMED
-        booking.save(update_fields=['status'])
-        Booking.objects.filter(
-            ad=booking.ad,
-            status=Booking.PENDING,
-            date_from__lte=booking.date_to,
-            date_to__gte=booking.date_from,
-        ).exclude(pk=booking.pk).update(status=Booking.CANCELLED)
+        try:
+            confirm_booking(booking)
+        except BookingOverlapError:
+            return Response(
+                {'detail': 'Requested dates overlap with a confirmed booking.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         return Response({'detail': 'Confirmed'}, status=status.HTTP_200_OK)
 
     @extend_schema(
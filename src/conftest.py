@@ -1,9 +1,37 @@
 import pytest
 from django.core.cache import caches
 from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+
+
+def _relax_sqlite_durability(sender, connection, **kwargs):
+    """The test DB is throwaway: on SQLite skip fsync and on-disk journaling."""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA journal_mode=MEMORY")
+
+
+connection_created.connect(_relax_sqlite_durability)
+
 
 @pytest.fixture(autouse=True)
 def clear_all_caches():
     """Reset throttle history and any per-site cache before every test."""
     for alias in settings.CACHES.keys():
         caches[alias].clear()
+
+
+@pytest.fixture(scope="class")
+def class_rows(request, django_db_setup, django_db_blocker):
+    """
+    setUpTestData for plain pytest classes: runs the class's build_rows()
+    classmethod once, in an outer transaction rolled back after the class.
+    Each test's own transaction nests inside it as a savepoint, so tests
+    may read these rows but must not rely on changes to them surviving.
+    """
+    with django_db_blocker.unblock(), transaction.atomic():
+        request.cls.build_rows()
+        yield
+        transaction.set_rollback(True)
@@ -162,6 +162,8 @@ AD_IMAGE_MAX_MB = 5                # max file size in MB
 AD_IMAGE_ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP"}  # allowed formats
 AD_IMAGE_MAX_WIDTH = 6000          # max width in pixels
 AD_IMAGE_MAX_HEIGHT = 6000         # max height in pixels
+AD_IMAGE_DELETE_WORKERS = int(os.getenv("AD_IMAGE_DELETE_WORKERS", 4))  # background file deletes (0 = inline)
+AD_IMAGE_UPLOAD_WORKERS = int(os.getenv("AD_IMAGE_UPLOAD_WORKERS", 4))  # parallel file writes per upload (0 = sequential)
 
 
 MEDIA_URL = '/media/'
@@ -230,6 +232,8 @@ if 'test' in sys.argv:
     REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['ads_list'] = '2/min'
     REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['ads_availability'] = '2/min'
     REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['auth_login'] = '2/min'
+    # Fixture users are created constantly; PBKDF2 would dominate setup time
+    PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=180),
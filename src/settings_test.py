@@ -1,6 +1,18 @@
 # Test settings override: isolate caches, keep throttling exactly as in base settings.
+import os
+
 from .settings import *  # noqa
 
+# TEST_FAST=1: run against in-memory SQLite instead of MySQL (no server needed).
+# The ORM queries and migrations are portable; use MySQL for release checks.
+if os.getenv("TEST_FAST") == "1":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+        }
+    }
+
 # In-memory cache to avoid cross-test pollution (throttle history, etc.)
 CACHES = {
     "default": {
@@ -17,6 +29,10 @@ CACHE_MIDDLEWARE_KEY_PREFIX = "tests"
 PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
+# Write/delete image files inline so tests can assert on storage right away
+AD_IMAGE_DELETE_WORKERS = 0
+AD_IMAGE_UPLOAD_WORKERS = 0
+
 # IMPORTANT:
 # Do NOT override REST_FRAMEWORK here.
 # Throttling classes/rates stay exactly as in base settings.
@@ -5,7 +5,6 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework import viewsets, permissions, status
 from rest_framework import serializers as rf_serializers
 from rest_framework.response import Response
-from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import (
     TokenObtainPairView as BaseTokenObtainPairView,
@@ -77,7 +76,7 @@ class DebugTokenPayloadSerializer(rf_serializers.Serializer):
 class RegisterView(CreateAPIView):
     serializer_class = RegistrationSerializer
     permission_classes = [AllowAny]
-    throttle_classes = (ScopedRateThrottle,)
+    throttle_classes = (ScopedRateThrottleIsolated,)
     throttle_scope = 'auth_register'
 
     def create(self, request, *args, **kwargs):
@@ -258,7 +257,7 @@ class LogoutView(APIView):
 class DebugTokenView(APIView):
     """token info"""
     permission_classes = [AllowAny]
-    throttle_classes = (ScopedRateThrottle,)
+    throttle_classes = (ScopedRateThrottleIsolated,)
     throttle_scope = 'auth_debug'
 
     def get(self, request):